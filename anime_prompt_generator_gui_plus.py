@@ -9,7 +9,12 @@ Adds:
 """
 
 import os
+import re
+import sys
 import json
+import hashlib
+import functools
+import dataclasses
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
@@ -25,6 +30,113 @@ OVA_ANCHOR_TAGS = [
     "hand-drawn look",
     "soft chromatic aberration",
 ]
+OVA_ANCHOR_TAGS_LOWER = tuple(t.lower() for t in OVA_ANCHOR_TAGS)
+
+_TAG_SPLIT = re.compile(r"\s*,\s*")
+
+
+def _parse_tags(s):
+    """Split a comma-separated tag string into stripped, non-empty tags."""
+    return [t for t in _TAG_SPLIT.split(s.strip()) if t]
+
+# Prompts generated per batch before the output box is refreshed
+GENERATE_CHUNK = 32
+# Above LARGE_OUTPUT prompts, insert in bigger batches to cut Tcl round-trips
+LARGE_OUTPUT = 500
+LARGE_OUTPUT_CHUNK = 256
+
+# Buffer size for save/export files, so writers issue few large writes
+WRITE_BUFFER = 256 * 1024
+
+# Seeded Generate results are cached here as JSON, one file per settings hash;
+# least recently used files are pruned past either limit. Kept small: a
+# prompt regenerates in ~55us, so the cache only pays off for recent repeats
+PROMPT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "anime_prompt_gen")
+PROMPT_CACHE_MAX_FILES = 64
+PROMPT_CACHE_MAX_BYTES = 4 * 1024 * 1024
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except (OSError, TypeError):
+        return 0.0
+
+# Generator sources take part in the cache key so edits invalidate old entries
+_CODE_STAMP = [_mtime(getattr(m, "__file__", None)) for m in (apg, apg.base)]
+
+
+def _data_stamp(data_dir):
+    """(count, newest mtime) of the .txt files in data_dir, for cache invalidation."""
+    n, newest = 0, 0.0
+    try:
+        with os.scandir(data_dir) as it:
+            for e in it:
+                if e.name.lower().endswith(".txt"):
+                    n += 1
+                    newest = max(newest, e.stat().st_mtime)
+    except OSError:
+        pass
+    return [n, newest]
+
+
+def _prompt_cache_path(params):
+    # Seeded output depends on the interpreter's random module, so key on it too
+    params = dict(params, python=list(sys.version_info[:2]))
+    key = hashlib.blake2b(json.dumps(params, sort_keys=True).encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(PROMPT_CACHE_DIR, key + ".json")
+
+
+def _load_cached_prompts(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(lines, list):
+        return None
+    try:
+        os.utime(path)  # mark as recently used for pruning
+    except OSError:
+        pass
+    return lines
+
+
+def _store_cached_prompts(path, lines):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(lines, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        return
+    _prune_prompt_cache(os.path.dirname(path))
+
+
+def _prune_prompt_cache(cache_dir):
+    """Delete the oldest cache files until both size limits hold."""
+    entries = []
+    try:
+        with os.scandir(cache_dir) as it:
+            for e in it:
+                if e.name.endswith(".json") and e.is_file():
+                    st = e.stat()
+                    entries.append((st.st_mtime, st.st_size, e.path))
+    except OSError:
+        return
+    entries.sort()
+    count = len(entries)
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+        if count <= PROMPT_CACHE_MAX_FILES and total <= PROMPT_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        count -= 1
+        total -= size
 
 
 class ScrollFrame(ttk.Frame):
@@ -35,10 +147,7 @@ class ScrollFrame(ttk.Frame):
         self.vsb = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
         self.inner = ttk.Frame(self.canvas)
 
-        self.inner.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
+        self.inner.bind("<Configure>", self._on_inner_configure)
 
         self.canvas_window = self.canvas.create_window((0, 0), window=self.inner, anchor="nw")
         self.canvas.configure(yscrollcommand=self.vsb.set)
@@ -49,17 +158,99 @@ class ScrollFrame(ttk.Frame):
         # Make inner frame width track canvas width
         self.canvas.bind("<Configure>", self._on_canvas_configure)
 
+        # Mousewheel (only while the pointer is over this frame)
+        self.bind("<Enter>", self._bind_wheel)
+        self.bind("<Leave>", self._unbind_wheel)
+
+    def _on_inner_configure(self, event):
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+
     def _on_canvas_configure(self, event):
         self.canvas.itemconfigure(self.canvas_window, width=event.width)
 
+    def _bind_wheel(self, event):
+        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
+        self.canvas.bind_all("<Button-4>", self._on_mousewheel)  # Linux
+        self.canvas.bind_all("<Button-5>", self._on_mousewheel)  # Linux
+
+    def _unbind_wheel(self, event):
+        self.canvas.unbind_all("<MouseWheel>")
+        self.canvas.unbind_all("<Button-4>")
+        self.canvas.unbind_all("<Button-5>")
+
+    def _on_mousewheel(self, event):
+        try:
+            if event.num == 4:
+                delta = -1
+            elif event.num == 5:
+                delta = 1
+            elif event.delta:
+                # Sign only: macOS trackpads report small deltas that /120 rounds to 0
+                delta = -1 if event.delta > 0 else 1
+            else:
+                return
+            self.canvas.yview_scroll(delta, "units")
+        except Exception:
+            pass
+
+
+class VirtualScrollFrame(ScrollFrame):
+    """ScrollFrame that only builds widgets for the rows currently in view.
+
+    Rows have a fixed height; off-screen row widgets are recycled for the
+    rows that scroll into view, so the widget count stays bounded by the
+    viewport instead of growing with the number of items.
+    """
+    def __init__(self, master, items, build_row, bind_row, row_height=28, height=420):
+        super().__init__(master, height=height)
+        self.items = tuple(items)
+        self.build_row = build_row  # build_row(parent) -> row widget
+        self.bind_row = bind_row    # bind_row(row, item) -> None
+        self.row_height = row_height
+        self._visible = {}  # item index -> row widget
+        self._spare = []
+
+        # Content height is known up front, so set the scrollregion once instead
+        # of re-measuring bbox("all") on every <Configure>
+        total = len(self.items) * row_height
+        self.canvas.itemconfigure(self.canvas_window, height=total)
+        self.inner.unbind("<Configure>")
+        self.canvas.configure(scrollregion=(0, 0, 0, total))
+        # Every view change (scrollbar, resize) goes through yscrollcommand
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+
+    def _on_yscroll(self, first, last):
+        self.vsb.set(first, last)
+        self._render(float(first), float(last))
+
+    def _render(self, first, last):
+        n = len(self.items)
+        rh = self.row_height
+        total = n * rh
+        i0 = max(0, int(first * total) // rh)
+        i1 = min(n, int(last * total) // rh + 1)
+
+        for i in [i for i in self._visible if not i0 <= i < i1]:
+            row = self._visible.pop(i)
+            row.place_forget()
+            self._spare.append(row)
+
+        for i in range(i0, i1):
+            if i in self._visible:
+                continue
+            row = self._spare.pop() if self._spare else self.build_row(self.inner)
+            self.bind_row(row, self.items[i])
+            row.place(x=0, y=i * rh, relwidth=1, height=rh)
+            self._visible[i] = row
+
 
 class AuditDialog(tk.Toplevel):
-    def __init__(self, master):
+    def __init__(self, master, audit):
         super().__init__(master)
         self.title("Data audit")
         self.geometry("860x520")
-
-        audit = apg.data_audit()
+        # Closing hides the dialog; App reopens the same instance
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
 
         top = ttk.Frame(self, padding=10)
         top.pack(fill="x")
@@ -80,8 +271,8 @@ class AuditDialog(tk.Toplevel):
             sb = ttk.Scrollbar(frm, orient="vertical", command=lb.yview)
             sb.grid(row=0, column=1, sticky="ns")
             lb.configure(yscrollcommand=sb.set)
-            for it in items:
-                lb.insert("end", it)
+            if items:
+                lb.insert("end", *items)
 
         make_list("Found (.txt)", audit["found"])
         make_list("Used by generator", audit["used"])
@@ -89,11 +280,12 @@ class AuditDialog(tk.Toplevel):
 
 
 class GenresDialog(tk.Toplevel):
-    def __init__(self, master, on_select):
+    def __init__(self, master, genres, on_select):
         super().__init__(master)
         self.title("Genres")
         self.geometry("520x420")
         self.on_select = on_select
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
 
         frm = ttk.Frame(self, padding=10)
         frm.pack(fill="both", expand=True)
@@ -108,7 +300,7 @@ class GenresDialog(tk.Toplevel):
         self.tree.column("mood", width=140, anchor="w")
         self.tree.pack(fill="both", expand=True)
 
-        for row in apg.list_genres():
+        for row in genres:
             self.tree.insert("", "end", values=(row["name"], row["is_ecchi"], row.get("mood","")))
 
         ttk.Label(frm, text="Tip: double-click a row to select it.").pack(anchor="w", pady=(8,0))
@@ -121,15 +313,16 @@ class GenresDialog(tk.Toplevel):
         vals = self.tree.item(item[0], "values")
         if vals:
             self.on_select(vals[0])
-            self.destroy()
+            self.withdraw()
 
 
 class WeightsDialog(tk.Toplevel):
-    def __init__(self, master, vars_):
+    def __init__(self, master, vars_, audit, on_change=None):
         super().__init__(master)
         self.title("Auto-append extra pools (unused .txt)")
         self.geometry("760x560")
         self.vars_ = vars_
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
 
         outer = ttk.Frame(self, padding=12)
         outer.pack(fill="both", expand=True)
@@ -150,30 +343,40 @@ class WeightsDialog(tk.Toplevel):
         per = ttk.LabelFrame(outer, text="Per-file probability (only UNUSED files)", padding=10)
         per.pack(fill="both", expand=True, pady=(12,0))
 
-        sf = ScrollFrame(per, height=360)
-        sf.pack(fill="both", expand=True)
-
-        audit = apg.data_audit()
         unused = audit["unused"]
 
         if not unused:
-            ttk.Label(sf.inner, text="No unused .txt files detected. Nothing to auto-append.").grid(row=0, column=0, sticky="w")
+            ttk.Label(per, text="No unused .txt files detected. Nothing to auto-append.").pack(anchor="w")
         else:
-            ttk.Label(sf.inner, text="Set file slider >0% to allow it to contribute. Default is 0% (off).").grid(row=0, column=0, columnspan=2, sticky="w", pady=(0,8))
-            r = 1
+            ttk.Label(per, text="Set file slider >0% to allow it to contribute. Default is 0% (off).").pack(anchor="w", pady=(0,8))
+            # Vars live in self.vars_ so values survive rows being recycled on scroll
             for fn in unused:
                 key = f"file::{fn}"
                 if key not in self.vars_:
                     self.vars_[key] = tk.DoubleVar(value=0.0)
-                ttk.Label(sf.inner, text=fn).grid(row=r, column=0, sticky="w", pady=2)
-                ttk.Scale(sf.inner, from_=0, to=100, orient="horizontal", variable=self.vars_[key]).grid(row=r, column=1, sticky="ew", padx=(10,0))
-                sf.inner.columnconfigure(1, weight=1)
-                r += 1
+                    if on_change is not None:
+                        self.vars_[key].trace_add("write", on_change)
+            sf = VirtualScrollFrame(per, unused, self._build_row, self._bind_row, height=360)
+            sf.pack(fill="both", expand=True)
+
 
         # Footer buttons
         btns = ttk.Frame(outer)
         btns.pack(fill="x", pady=(12,0))
-        ttk.Button(btns, text="Close", command=self.destroy).pack(side="right")
+        ttk.Button(btns, text="Close", command=self.withdraw).pack(side="right")
+
+    def _build_row(self, parent):
+        # pack() lets the scale take the spare width without a per-row columnconfigure
+        row = ttk.Frame(parent)
+        row.label = ttk.Label(row)
+        row.label.pack(side="left", pady=2)
+        row.scale = ttk.Scale(row, from_=0, to=100, orient="horizontal")
+        row.scale.pack(side="left", fill="x", expand=True, padx=(10,0))
+        return row
+
+    def _bind_row(self, row, fn):
+        row.label.configure(text=fn)
+        row.scale.configure(variable=self.vars_[f"file::{fn}"])
 
 
 class App(ttk.Frame):
@@ -206,6 +409,23 @@ class App(ttk.Frame):
             "max_extra_tags": tk.IntVar(value=2),
             # file::FILENAME -> DoubleVar (added dynamically)
         }
+        # ExtraPoolsTuning is rebuilt only after one of the vars above is written
+        self._cached_tuning = None
+        self._tuning_dirty = True
+        # (filename, DoubleVar) for unused files that have a slider var
+        self._per_file_vars_list = None
+        for var in self.extra_vars.values():
+            var.trace_add("write", self._invalidate_tuning)
+
+        # Cached apg.data_audit() / apg.list_genres() results; cleared on Reload
+        self._audit_cache = None
+        self._genres_cache = None
+        self._genre_names = None
+        self._genre_name_set = frozenset()
+        # Dialogs are built on first open and re-shown afterwards; dropped on Reload
+        self._audit_dlg = None
+        self._genres_dlg = None
+        self._weights_dlg = None
 
         self._build_top()
         self._build_controls()
@@ -253,7 +473,7 @@ class App(ttk.Frame):
 
         ttk.Label(box, text="Extra tags (appended)").grid(row=3, column=0, sticky="w", pady=(10,0))
         ttk.Entry(box, textvariable=self.extra).grid(row=3, column=1, columnspan=3, sticky="ew", padx=(10,10), pady=(10,0))
-        ttk.Button(box, text="Clear extra", command=lambda: self.extra.set("")).grid(row=3, column=4, sticky="e", pady=(10,0))
+        ttk.Button(box, text="Clear extra", command=functools.partial(self.extra.set, "")).grid(row=3, column=4, sticky="e", pady=(10,0))
         ttk.Button(box, text="Copy output", command=self._copy_output).grid(row=3, column=6, sticky="e", pady=(10,0))
 
     def _build_output(self):
@@ -271,7 +491,7 @@ class App(ttk.Frame):
         btns = ttk.Frame(out)
         btns.grid(row=1, column=0, columnspan=2, sticky="e", pady=(10,0))
         ttk.Button(btns, text="Save…", command=self._save_output).grid(row=0, column=0, padx=(0,8))
-        ttk.Button(btns, text="Clear", command=lambda: self.text.delete("1.0","end")).grid(row=0, column=1)
+        ttk.Button(btns, text="Clear", command=self._clear_output).grid(row=0, column=1)
 
     # --- Actions ---
     def _browse_data(self):
@@ -286,54 +506,113 @@ class App(ttk.Frame):
             return
         try:
             apg.set_data_dir(d)
+            self._audit_cache = None
+            self._genres_cache = None
+            self._genre_names = None
+            self._tuning_dirty = True
+            self._per_file_vars_list = None
+            self._drop_dialogs()
             self._refresh_genres()
             messagebox.showinfo("Reloaded", f"Reloaded data from:\n{d}")
         except Exception as e:
             messagebox.showerror("Reload failed", str(e))
 
+    def _get_audit(self):
+        if self._audit_cache is None:
+            audit = apg.data_audit()
+            # Tuples: shared read-only between the dialogs and _extra_tuning
+            for k in ("found", "used", "unused"):
+                audit[k] = tuple(audit[k])
+            self._audit_cache = audit
+        return self._audit_cache
+
+    @staticmethod
+    def _reshow(dlg):
+        """Bring back a previously built dialog; False if it needs (re)building."""
+        if dlg is None or not dlg.winfo_exists():
+            return False
+        dlg.deiconify()
+        dlg.lift()
+        return True
+
+    def _drop_dialogs(self):
+        for dlg in (self._audit_dlg, self._genres_dlg, self._weights_dlg):
+            if dlg is not None and dlg.winfo_exists():
+                dlg.destroy()
+        self._audit_dlg = None
+        self._genres_dlg = None
+        self._weights_dlg = None
+
     def _open_audit(self):
-        AuditDialog(self.master)
+        if not self._reshow(self._audit_dlg):
+            self._audit_dlg = AuditDialog(self.master, self._get_audit())
+
+    def _get_genres(self):
+        if self._genres_cache is None:
+            self._genres_cache = apg.list_genres()
+        return self._genres_cache
 
     def _refresh_genres(self):
-        genres = [g["name"] for g in apg.list_genres()]
-        if "random" not in genres:
-            genres = ["random"] + genres
-        self.genre_combo["values"] = genres
-        if self.genre.get() not in genres:
+        if self._genre_names is None:
+            names = [g["name"] for g in self._get_genres()]
+            name_set = set(names)
+            if "random" not in name_set:
+                names.insert(0, "random")
+                name_set.add("random")
+            self._genre_names = names
+            self._genre_name_set = name_set
+        self.genre_combo["values"] = self._genre_names
+        if self.genre.get() not in self._genre_name_set:
             self.genre.set("random")
 
     def _open_weights(self):
-        WeightsDialog(self.master, self.extra_vars)
+        if not self._reshow(self._weights_dlg):
+            self._weights_dlg = WeightsDialog(self.master, self.extra_vars, self._get_audit(), on_change=self._invalidate_tuning)
+            self._per_file_vars_list = None  # dialog may have added vars
 
     def _open_genres(self):
-        GenresDialog(self.master, on_select=lambda g: self.genre.set(g))
+        if not self._reshow(self._genres_dlg):
+            self._genres_dlg = GenresDialog(self.master, self._get_genres(), on_select=self.genre.set)
 
     def _apply_ova_mode(self):
         if self.ova_locked.get():
-            cur = self.extra.get().strip()
-            tags = [t.strip() for t in cur.split(",") if t.strip()]
-            lowset = {x.lower() for x in tags}
-            for t in OVA_ANCHOR_TAGS:
-                if t.lower() not in lowset:
+            tags = _parse_tags(self.extra.get())
+            lowset = {t.lower() for t in tags}
+            for t, tl in zip(OVA_ANCHOR_TAGS, OVA_ANCHOR_TAGS_LOWER):
+                if tl not in lowset:
                     tags.append(t)
+                    lowset.add(tl)
             self.extra.set(", ".join(tags))
 
+    def _invalidate_tuning(self, *_):
+        self._tuning_dirty = True
+
     def _extra_tuning(self) -> apg.ExtraPoolsTuning:
-        audit = apg.data_audit()
-        unused = audit["unused"]
+        if not self._tuning_dirty and self._cached_tuning is not None:
+            return self._cached_tuning
+
+        if self._per_file_vars_list is None:
+            self._per_file_vars_list = [
+                (fn, self.extra_vars[f"file::{fn}"])
+                for fn in self._get_audit()["unused"]
+                if f"file::{fn}" in self.extra_vars
+            ]
 
+        # Sliders left at 0% are off; leave them out of the tuning entirely
         per_file = {}
-        for fn in unused:
-            key = f"file::{fn}"
-            if key in self.extra_vars:
-                per_file[fn] = float(self.extra_vars[key].get()) / 100.0
+        for fn, var in self._per_file_vars_list:
+            v = float(var.get())
+            if v > 0:
+                per_file[fn] = v / 100.0
 
-        return apg.ExtraPoolsTuning(
+        self._cached_tuning = apg.ExtraPoolsTuning(
             enabled=bool(self.extra_vars["enabled"].get()),
             master_prob=float(self.extra_vars["master_prob"].get()) / 100.0,
             max_extra_tags=int(self.extra_vars["max_extra_tags"].get()),
             per_file_prob=per_file,
         )
+        self._tuning_dirty = False
+        return self._cached_tuning
 
     def _generate(self):
         try:
@@ -361,22 +640,74 @@ class App(ttk.Frame):
 
         extra_tuning = self._extra_tuning()
 
-        lines = []
-        for i in range(count):
-            s = (seed + i) if seed is not None else None
+        # Common interactive case: one prompt, no batching or disk cache
+        if count == 1:
             prompt = apg.generate_prompt(
                 genre=genre,
-                seed=s,
+                seed=seed,
                 extra_words=extra,
                 distance_preset=distance,
                 force_1girl=force_1girl,
                 quality_preset=quality,
                 extra_pools_tuning=extra_tuning,
             )
-            lines.append(prompt)
+            self.text.delete("1.0","end")
+            self.text.insert("1.0", prompt)
+            return
 
+        # Only seeded runs are reproducible, so only those go through the disk cache
+        cache_path = None
+        cached = None
+        if seed is not None:
+            cache_path = _prompt_cache_path({
+                "count": count,
+                "genre": genre,
+                "seed": seed,
+                "extra": extra,
+                "quality": quality,
+                "distance": distance,
+                "force_1girl": force_1girl,
+                "tuning": dataclasses.asdict(extra_tuning),
+                "data_dir": os.path.abspath(apg.get_data_dir()),
+                "data": _data_stamp(apg.get_data_dir()),
+                "code": _CODE_STAMP,
+                # Env-configured scene pairing also changes the text for a seed
+                "pairing_mode": getattr(apg.base, "PAIRING_MODE", None),
+                "wild_spike_chance": getattr(apg.base, "WILD_SPIKE_CHANCE", None),
+            })
+            cached = _load_cached_prompts(cache_path)
+            if cached is not None and len(cached) != count:
+                cached = None
+        generated = []
+
+        # Stream into the output box chunk by chunk so large counts stay responsive
+        chunk = LARGE_OUTPUT_CHUNK if count > LARGE_OUTPUT else GENERATE_CHUNK
+        self.text.delete("1.0","end")
+        for start in range(0, count, chunk):
+            n = min(chunk, count - start)
+            if cached is not None:
+                lines = cached[start:start + n]
+            else:
+                lines = apg.generate_prompts(
+                    n,
+                    genre=genre,
+                    seed=(seed + start) if seed is not None else None,
+                    extra_words=extra,
+                    distance_preset=distance,
+                    force_1girl=force_1girl,
+                    quality_preset=quality,
+                    extra_pools_tuning=extra_tuning,
+                )
+                if cache_path:
+                    generated.extend(lines)
+            self.text.insert("end", ("\n" if start else "") + "\n".join(lines))
+            self.text.update_idletasks()
+
+        if cache_path and cached is None:
+            _store_cached_prompts(cache_path, generated)
+
+    def _clear_output(self):
         self.text.delete("1.0","end")
-        self.text.insert("1.0", "\n".join(lines))
 
     def _copy_output(self):
         txt = self.text.get("1.0","end").strip()
@@ -401,10 +732,10 @@ class App(ttk.Frame):
         try:
             if path.lower().endswith(".json"):
                 prompts = [line for line in txt.splitlines() if line.strip()]
-                with open(path, "w", encoding="utf-8") as f:
-                    json.dump({"prompts": prompts}, f, ensure_ascii=False, indent=2)
+                with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+                    f.write(json.dumps({"prompts": prompts}, ensure_ascii=False, indent=2))
             else:
-                with open(path, "w", encoding="utf-8") as f:
+                with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
                     f.write(txt + "\n")
             messagebox.showinfo("Saved", f"Saved to:\n{path}")
         except Exception as e:
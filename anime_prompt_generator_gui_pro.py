@@ -17,10 +17,16 @@ Implements:
 - Status bar (data loaded counts, last action)
 """
 
+import collections
+import contextlib
 import json
+from itertools import chain
 import os
+import re
 import sys
 import time
+import queue
+import threading
 import tkinter as tk
 from typing import List, cast
 from tkinter import ttk, filedialog, messagebox
@@ -69,6 +75,8 @@ OVA_ANCHOR_TAGS = [
     "hand-drawn look",
     "soft chromatic aberration",
 ]
+_OVA_LOWER = tuple(t.lower() for t in OVA_ANCHOR_TAGS)  # aligned with OVA_ANCHOR_TAGS
+OVA_ANCHORS = frozenset(_OVA_LOWER)
 
 
 # ---------- helpers ----------
@@ -89,13 +97,22 @@ class ScrollFrame(ttk.Frame):
 
         self.canvas.bind("<Configure>", self._on_canvas)
 
-        # Mousewheel
+        # Mousewheel (only while the pointer is over this frame)
+        self.bind("<Enter>", self._bind_wheel)
+        self.bind("<Leave>", self._unbind_wheel)
+
+    def _on_canvas(self, event):
+        self.canvas.itemconfigure(self.win, width=event.width)
+
+    def _bind_wheel(self, _evt=None):
         self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
         self.canvas.bind_all("<Button-4>", self._on_mousewheel)  # Linux
         self.canvas.bind_all("<Button-5>", self._on_mousewheel)  # Linux
 
-    def _on_canvas(self, event):
-        self.canvas.itemconfigure(self.win, width=event.width)
+    def _unbind_wheel(self, _evt=None):
+        self.canvas.unbind_all("<MouseWheel>")
+        self.canvas.unbind_all("<Button-4>")
+        self.canvas.unbind_all("<Button-5>")
 
     def _on_mousewheel(self, event):
         try:
@@ -110,39 +127,90 @@ class ScrollFrame(ttk.Frame):
             pass
 
 
+def _dir_stamp(d):
+    """(dir mtime, .txt count, newest .txt mtime) for change detection.
+
+    File mtimes are included because editing a file in place does not touch
+    the directory's own mtime.
+    """
+    st = os.stat(d)
+    n, newest = 0, 0
+    with os.scandir(d) as it:
+        for e in it:
+            if e.name.lower().endswith(".txt"):
+                n += 1
+                newest = max(newest, e.stat().st_mtime_ns)
+    return (st.st_mtime_ns, n, newest)
+
+
+# Buffer size for save/export files, so writers issue few large writes
+WRITE_BUFFER = 256 * 1024
+
+# How often (ms) the Tk thread drains finished prompts from the worker
+GEN_POLL_MS = 50
+
+
+def _generate_one(i, job):
+    """Prompt i of a batch job; pure apart from apg's RNG, safe off the Tk thread."""
+    seed0 = job["seed0"]
+    # decide seed for this prompt
+    if seed0 is None:
+        seed = None
+    elif job["lock_seed"]:
+        seed = seed0
+    else:
+        seed = seed0 + i if job["increment_seed"] else seed0
+
+    p = apg.generate_prompt(seed=seed, **job["kwargs"])
+    if job["negative"]:
+        p = p + f" | NEGATIVE: {job['negative']}"
+    return p
+
+
+# History keeps the most recent batches only
+HISTORY_MAX = 1000
+
+# Unused-file previews only read this much of the file
+PREVIEW_BYTES = 20000
+
+# One comma-separated prompt token, whitespace-trimmed, with its offsets
+_TOKEN_RE = re.compile(r"\s*([^,\s][^,]*?)\s*(?:,|$)")
+
+# Boilerplate quality tokens shown dimmed in the output
+_DIM_TOKENS = frozenset({"masterpiece", "best quality", "high quality", "ultra detailed"})
+
+
 class TagText(tk.Text):
     """Text widget with simple tag highlighting."""
+    _TAG_STYLES = {"dim": "#7a7a7a", "hi": "#ffffff", "extra": "#7bdcff"}
+
     def __init__(self, master, **kwargs):
+        kwargs.setdefault("font", ("TkDefaultFont", 10))
         super().__init__(master, wrap="word", **kwargs)
-        self.tag_configure("dim", foreground="#7a7a7a")
-        self.tag_configure("hi", foreground="#ffffff")
-        self.tag_configure("extra", foreground="#7bdcff")
-        self.configure(font=("TkDefaultFont", 10))
+        for name, fg in self._TAG_STYLES.items():
+            self.tag_configure(name, foreground=fg)
 
     def set_prompt(self, prompt: str, extra_markers=None):
         self.delete("1.0", "end")
         self.insert("1.0", prompt)
-        self._apply_highlight(extra_markers or [])
+        self._apply_highlight(prompt, extra_markers or [])
+        # Clean slate: a later edit_modified() means the user typed in the box
+        self.edit_modified(False)
 
-    def _apply_highlight(self, extra_markers):
+    def _apply_highlight(self, txt, extra_markers):
         # Dim anchor/boilerplate-ish tokens a bit, highlight extras if provided.
-        txt = self.get("1.0", "end-1c")
-        parts = [p.strip() for p in txt.split(",") if p.strip()]
-        # Rebuild with tags: easiest is clear and insert chunk by chunk.
-        self.delete("1.0", "end")
-        for i, p in enumerate(parts):
-            if i:
-                self.insert("end", ", ")
+        # Tags are laid over the text already inserted, as character ranges.
+        extra_low = [m.lower() for m in extra_markers]
+        for m in _TOKEN_RE.finditer(txt):
             tag = "hi"
-            low = p.lower()
-            if low in {"masterpiece", "best quality", "high quality", "ultra detailed"}:
+            low = m.group(1).lower()
+            if low in _DIM_TOKENS:
                 tag = "dim"
-            if any(m.lower() in low for m in extra_markers):
+            if any(x in low for x in extra_low):
                 tag = "extra"
-            self.insert("end", p, (tag,))
+            self.tag_add(tag, f"1.0+{m.start(1)}c", f"1.0+{m.end(1)}c")
 
 
-# ---------- main app ----------
 class App(ttk.Frame):
     def __init__(self, master):
         super().__init__(master, padding=10)
@@ -182,13 +250,42 @@ class App(ttk.Frame):
 
         self.per_file_vars = {}  # filename -> DoubleVar 0..100
 
+        # (data dir, _dir_stamp) of the last full Reload
+        self._last_reload_key = None
+        # apg.data_audit() memo, keyed by (data dir, dir mtime)
+        self._audit_cache = None
+        self._audit_key = None
+        # apg.list_genres() rows and combobox names per data dir; cleared on Reload
+        self._genres_cache = {}
+        # Per-file auto-append rows, built once and shown/hidden by the filters
+        self._auto_rows = {}  # filename -> {"label", "scale", "entry", "trace"}
+        self._auto_msg = None
+        self._auto_hint = None
+        # (audit unused list, its lowercased names) and (last query, its hits)
+        self._unused_lower = (None, ())
+        self._last_search = ("", None)
+        self._unused_frozen = (None, frozenset())
+        # Pending after() job for the debounced search refresh
+        self._auto_refresh_job = None
+        # Per-file entries waiting for an idle-time resync with their slider
+        self._dirty_entries = set()
+        self._entry_flush_job = None
+        self._entry_flush_suppressed = False
+
         # History / Favorites
-        self.history = []   # list of dicts
+        self.history = collections.deque(maxlen=HISTORY_MAX)  # dicts, oldest first
         self.favorites = [] # list of dicts
         self.current_prompt = ""
 
-        # Batch/progress
-        self._cancel_batch = False
+        # Batch/progress: prompts are generated on a worker thread and handed
+        # back through _gen_results, which the Tk thread drains every GEN_POLL_MS
+        self._cancel_batch = threading.Event()
+        self._gen_job = None
+        self._gen_poll_id = None  # pending after() id; one drain chain at a time
+        self._gen_jobs = queue.Queue()
+        self._gen_results = queue.Queue()
+        self._gen_worker = threading.Thread(target=self._gen_worker_loop, daemon=True)
+        self._gen_worker.start()
 
         # UI
         self._build_preset_bar()
@@ -377,14 +474,14 @@ class App(ttk.Frame):
         ttk.Label(flt, text="Search").grid(row=0, column=0, sticky="w")
         ent = ttk.Entry(flt, textvariable=self.auto_search)
         ent.grid(row=0, column=1, sticky="ew", padx=(10,0))
-        ent.bind("<KeyRelease>", lambda e: self._refresh_auto_file_list())
+        ent.bind("<KeyRelease>", self._schedule_auto_refresh)
 
         opts = ttk.Frame(flt)
         opts.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(8,0))
         ttk.Checkbutton(opts, text="Show enabled only", variable=self.auto_filter_enabled_only, command=self._refresh_auto_file_list).pack(side="left")
         ttk.Checkbutton(opts, text="Show nonzero only", variable=self.auto_filter_nonzero_only, command=self._refresh_auto_file_list).pack(side="left", padx=(10,0))
-        ttk.Button(opts, text="Set all visible to 10%", command=lambda: self._set_visible_auto(10)).pack(side="right")
-        ttk.Button(opts, text="Set all visible to 0%", command=lambda: self._set_visible_auto(0)).pack(side="right", padx=(8,0))
+        ttk.Button(opts, text="Set all visible to 10%", command=lambda: self.master.after_idle(self._set_visible_auto, 10)).pack(side="right")
+        ttk.Button(opts, text="Set all visible to 0%", command=lambda: self.master.after_idle(self._set_visible_auto, 0)).pack(side="right", padx=(8,0))
 
         self.auto_list_frame = ScrollFrame(flt, height=360)
         self.auto_list_frame.grid(row=2, column=0, columnspan=2, sticky="nsew", pady=(10,0))
@@ -523,23 +620,50 @@ class App(ttk.Frame):
             if not silent:
                 messagebox.showerror("Invalid folder", "That data folder path doesn’t exist.")
             return
+        try:
+            key = (d, _dir_stamp(d))
+        except OSError:
+            key = None
+        if key is not None and key == self._last_reload_key:
+            # Same folder, nothing on disk changed: skip the rescan/rebuild
+            self._set_status("Data unchanged", "")
+            if not silent:
+                messagebox.showinfo("Reloaded", f"Data is already up to date:\n{d}")
+            return
         try:
             apg.set_data_dir(d)
+            self._audit_cache = None
+            self._genres_cache.clear()
             self._refresh_genres()
             self._populate_unused()
             self._refresh_auto_file_list()
-            audit = apg.data_audit()
+            audit = self._audit()
             self.data_summary.configure(text=f"Found {audit['found_count']} .txt | Used {audit['used_count']} | Unused {audit['unused_count']}")
             self._set_status("Data loaded", f"Found {audit['found_count']} | Used {audit['used_count']} | Unused {audit['unused_count']}")
             if not silent:
                 messagebox.showinfo("Reloaded", f"Reloaded data from:\n{d}")
+            # Only a fully successful refresh may short-circuit the next Reload
+            self._last_reload_key = key
         except Exception as e:
+            self._last_reload_key = None
             if not silent:
                 messagebox.showerror("Reload failed", str(e))
             self._set_status("Reload failed", str(e))
 
+    def _audit(self):
+        """apg.data_audit(), recomputed only when the data dir or its mtime changes."""
+        d = apg.get_data_dir()
+        try:
+            key = (d, os.stat(d).st_mtime_ns)
+        except OSError:
+            key = (d, None)
+        if self._audit_cache is None or key != self._audit_key:
+            self._audit_cache = apg.data_audit_cached()
+            self._audit_key = key
+        return self._audit_cache
+
     def _open_audit(self):
-        audit = apg.data_audit()
+        audit = self._audit()
         msg = (
             f"Data folder:\n{audit['data_dir']}\n\n"
             f"Found: {audit['found_count']}\n"
@@ -564,10 +688,20 @@ class App(ttk.Frame):
             pass
 
     # ---------- genres ----------
+    def _genres(self):
+        """(list_genres() rows, combobox names) for the active data dir."""
+        d = apg.get_data_dir()
+        hit = self._genres_cache.get(d)
+        if hit is None:
+            rows = apg.list_genres()
+            names = [g["name"] for g in rows]
+            if "random" not in names:
+                names = ["random"] + names
+            hit = self._genres_cache[d] = (rows, names)
+        return hit
+
     def _refresh_genres(self):
-        genres = [g["name"] for g in apg.list_genres()]
-        if "random" not in genres:
-            genres = ["random"] + genres
+        genres = self._genres()[1]
         self.genre_combo["values"] = genres
         if self.genre.get() not in genres:
             self.genre.set("random")
@@ -591,7 +725,7 @@ class App(ttk.Frame):
         tree.column("mood", width=140, anchor="w")
         tree.pack(fill="both", expand=True)
 
-        for row in apg.list_genres():
+        for row in self._genres()[0]:
             tree.insert("", "end", values=(row["name"], row["is_ecchi"], row.get("mood","")))
 
         ttk.Label(frm, text="Double-click to select.").pack(anchor="w", pady=(8,0))
@@ -610,10 +744,10 @@ class App(ttk.Frame):
     # ---------- unused browser ----------
     def _populate_unused(self):
         self.unused_list.delete(0, "end")
-        audit = apg.data_audit()
+        audit = self._audit()
         unused = cast(List[str], audit["unused"])
-        for fn in unused:
-            self.unused_list.insert("end", fn)
+        if unused:
+            self.unused_list.insert("end", *unused)
         self.unused_preview.delete("1.0", "end")
         self.unused_preview.insert("1.0", "Select a file to preview its contents.\n")
 
@@ -623,38 +757,56 @@ class App(ttk.Frame):
             return
         fn = self.unused_list.get(sel[0])
         path = os.path.join(apg.DATA_DIR, fn)
+        # Capped read, so it stays cheap enough for the Tk thread
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                txt = f.read()
+            with open(path, "rb") as f:
+                txt = f.read(PREVIEW_BYTES).decode("utf-8", errors="replace")
         except Exception as e:
             txt = f"Failed to read: {e}"
         self.unused_preview.delete("1.0", "end")
-        self.unused_preview.insert("1.0", txt[:20000])
+        self.unused_preview.insert("1.0", txt)
 
     # ---------- auto-append per-file UI ----------
+    def _schedule_auto_refresh(self, _evt=None):
+        # Trailing-edge debounce: only the last keystroke in a burst rebuilds the list
+        if self._auto_refresh_job is not None:
+            self.master.after_cancel(self._auto_refresh_job)
+        self._auto_refresh_job = self.master.after(150, self._run_auto_refresh)
+
+    def _run_auto_refresh(self):
+        self._auto_refresh_job = None
+        self._refresh_auto_file_list()
+
     def _refresh_auto_file_list(self):
-        audit = apg.data_audit()
+        audit = self._audit()
         unused = cast(List[str], audit["unused"])
 
         q = self.auto_search.get().strip().lower()
         show_enabled_only = bool(self.auto_filter_enabled_only.get())
         show_nonzero_only = bool(self.auto_filter_nonzero_only.get())
 
-        # clear
-        for w in self.auto_list_frame.inner.winfo_children():
-            w.destroy()
+        inner = self.auto_list_frame.inner
+        if self._auto_msg is None:
+            self._auto_msg = ttk.Label(inner)
+            self._auto_hint = ttk.Label(inner, text="Set a slider >0% to allow that file to contribute.")
+            inner.columnconfigure(1, weight=1)
+
+        # drop rows for files that are no longer unused
+        unused_set = set(unused)
+        for fn in [fn for fn in self._auto_rows if fn not in unused_set]:
+            self._destroy_auto_row(fn)
 
         if not unused:
-            ttk.Label(self.auto_list_frame.inner, text="No unused .txt files detected.").grid(row=0, column=0, sticky="w")
+            self._auto_hint.grid_remove()
+            self._auto_msg.configure(text="No unused .txt files detected.")
+            self._auto_msg.grid(row=0, column=0, sticky="w")
             return
 
-        ttk.Label(self.auto_list_frame.inner, text="Set a slider >0% to allow that file to contribute.").grid(row=0, column=0, columnspan=3, sticky="w", pady=(0,8))
+        self._auto_hint.grid(row=0, column=0, columnspan=3, sticky="w", pady=(0,8))
+        self._auto_msg.grid_remove()
 
-        r = 1
-        visible = 0
-        for fn in unused:
-            if q and q not in fn.lower():
-                continue
+        shown = []
+        for fn in self._search_matches(unused, q):
             if fn not in self.per_file_vars:
                 self.per_file_vars[fn] = tk.DoubleVar(value=0.0)
             v = float(self.per_file_vars[fn].get())
@@ -662,51 +814,121 @@ class App(ttk.Frame):
                 continue
             if show_enabled_only and not self.auto_enabled.get():
                 continue
-
-            ttk.Label(self.auto_list_frame.inner, text=fn).grid(row=r, column=0, sticky="w", pady=2)
-            s = ttk.Scale(self.auto_list_frame.inner, from_=0, to=100, orient="horizontal", variable=self.per_file_vars[fn],
-                          command=lambda _x=None: None)
-            s.grid(row=r, column=1, sticky="ew", padx=(10,10))
-            ent = ttk.Entry(self.auto_list_frame.inner, width=5)
-            ent.grid(row=r, column=2, sticky="e")
-
-            # keep entry synced
-            def _bind_entry(e, var=self.per_file_vars[fn]):
-                txt = e.widget.get().strip()
-                try:
-                    val = float(txt)
-                    var.set(max(0.0, min(100.0, val)))
-                except Exception:
-                    pass
-
-            ent.insert(0, f"{v:.0f}")
-            def _sync_entry(var=self.per_file_vars[fn], entry=ent):
-                try:
-                    entry.delete(0, "end")
-                    entry.insert(0, f"{float(var.get()):.0f}")
-                except Exception:
-                    pass
-
-            self.per_file_vars[fn].trace_add("write", lambda *_a, var=self.per_file_vars[fn], entry=ent: _sync_entry(var, entry))
-            ent.bind("<Return>", _bind_entry)
-
-            self.auto_list_frame.inner.columnconfigure(1, weight=1)
-            r += 1
-            visible += 1
-
-        if visible == 0:
-            ttk.Label(self.auto_list_frame.inner, text="No files match your filters.").grid(row=1, column=0, sticky="w")
+            shown.append(fn)
+
+        shown_set = set(shown)
+        for fn, row in self._auto_rows.items():
+            if fn not in shown_set:
+                for w in (row["label"], row["scale"], row["entry"]):
+                    w.grid_remove()
+
+        for r, fn in enumerate(shown, start=1):
+            row = self._auto_rows.get(fn)
+            if row is None:
+                row = self._make_auto_row(fn)
+            row["label"].grid(row=r, column=0, sticky="w", pady=2)
+            row["scale"].grid(row=r, column=1, sticky="ew", padx=(10,10))
+            row["entry"].grid(row=r, column=2, sticky="e")
+
+        if not shown:
+            self._auto_msg.configure(text="No files match your filters.")
+            self._auto_msg.grid(row=1, column=0, sticky="w")
+
+    def _search_matches(self, unused, q):
+        """Filenames in `unused` containing `q` (already lowercased), in order.
+
+        Lowercased names are cached per audit list; when `q` extends the
+        previous query only the previous hits are re-checked.
+        """
+        if self._unused_lower[0] is not unused:
+            self._unused_lower = (unused, tuple(fn.lower() for fn in unused))
+            self._last_search = ("", None)
+        if not q:
+            return unused
+        last_q, last_hits = self._last_search
+        if last_hits is not None and last_q and q.startswith(last_q):
+            pool = last_hits
+        else:
+            pool = zip(unused, self._unused_lower[1])
+        hits = [(fn, low) for fn, low in pool if q in low]
+        self._last_search = (q, hits)
+        return [fn for fn, _ in hits]
+
+    def _make_auto_row(self, fn):
+        """Build the label/scale/entry widgets for one file; kept in self._auto_rows."""
+        inner = self.auto_list_frame.inner
+        var = self.per_file_vars[fn]
+        lbl = ttk.Label(inner, text=fn)
+        s = ttk.Scale(inner, from_=0, to=100, orient="horizontal", variable=var)
+        ent = ttk.Entry(inner, width=5)
+        ent.insert(0, f"{float(var.get()):.0f}")
+
+        # keep entry synced
+        def _bind_entry(e, var=var):
+            txt = e.widget.get().strip()
+            try:
+                val = float(txt)
+                var.set(max(0.0, min(100.0, val)))
+            except Exception:
+                pass
+
+        trace = var.trace_add("write", lambda *_a, fn=fn: self._schedule_entry_flush(fn))
+        ent.bind("<Return>", _bind_entry)
+
+        row = {"label": lbl, "scale": s, "entry": ent, "trace": trace}
+        self._auto_rows[fn] = row
+        return row
+
+    def _schedule_entry_flush(self, fn):
+        # Slider drags write many times per second; resync entries once per idle cycle
+        self._dirty_entries.add(fn)
+        if self._entry_flush_job is None and not self._entry_flush_suppressed:
+            self._entry_flush_job = self.master.after_idle(self._flush_dirty_entries)
+
+    @contextlib.contextmanager
+    def _suppress_entry_flush(self):
+        """Collect dirty entries without scheduling; flush them once on exit."""
+        self._entry_flush_suppressed = True
+        try:
+            yield
+        finally:
+            self._entry_flush_suppressed = False
+            if self._entry_flush_job is not None:
+                self.master.after_cancel(self._entry_flush_job)
+            self._flush_dirty_entries()
+
+    def _flush_dirty_entries(self):
+        self._entry_flush_job = None
+        dirty, self._dirty_entries = self._dirty_entries, set()
+        for fn in dirty:
+            row = self._auto_rows.get(fn)
+            if row is None:
+                continue
+            entry = row["entry"]
+            try:
+                entry.delete(0, "end")
+                entry.insert(0, f"{float(self.per_file_vars[fn].get()):.0f}")
+            except Exception:
+                pass
+
+    def _destroy_auto_row(self, fn):
+        row = self._auto_rows.pop(fn)
+        try:
+            self.per_file_vars[fn].trace_remove("write", row["trace"])
+        except Exception:
+            pass
+        for w in (row["label"], row["scale"], row["entry"]):
+            w.destroy()
 
     def _set_visible_auto(self, pct: float):
-        audit = apg.data_audit()
+        audit = self._audit()
         unused = cast(List[str], audit["unused"])
         q = self.auto_search.get().strip().lower()
-        for fn in unused:
-            if q and q not in fn.lower():
-                continue
-            if fn not in self.per_file_vars:
-                self.per_file_vars[fn] = tk.DoubleVar(value=0.0)
-            self.per_file_vars[fn].set(float(pct))
+        with self._suppress_entry_flush():
+            for fn in self._search_matches(unused, q):
+                if fn not in self.per_file_vars:
+                    self.per_file_vars[fn] = tk.DoubleVar(value=0.0)
+                self.per_file_vars[fn].set(float(pct))
         self._refresh_auto_file_list()
 
     # ---------- generation ----------
@@ -719,13 +941,23 @@ class App(ttk.Frame):
         except Exception:
             raise ValueError("Seed must be an integer (or blank).")
 
-    def _auto_tuning_obj(self) -> apg.ExtraPoolsTuning:
-        audit = apg.data_audit()
-        unused = cast(List[str], audit["unused"])
+    def _unused_set(self, audit):
+        """frozenset of audit["unused"], rebuilt only when the audit list changes."""
+        unused = audit["unused"]
+        if self._unused_frozen[0] is not unused:
+            self._unused_frozen = (unused, frozenset(unused))
+        return self._unused_frozen[1]
+
+    def _auto_tuning_obj(self, audit=None) -> apg.ExtraPoolsTuning:
+        audit = audit or self._audit()
+        unused_set = self._unused_set(audit)
+        # Snapshot slider values once per batch; 0% sliders are off, so skip them
         per_file = {}
-        for fn in unused:
-            if fn in self.per_file_vars:
-                per_file[fn] = float(self.per_file_vars[fn].get()) / 100.0
+        for fn, var in self.per_file_vars.items():
+            if fn in unused_set:
+                v = float(var.get())
+                if v > 0:
+                    per_file[fn] = v / 100.0
         return apg.ExtraPoolsTuning(
             enabled=bool(self.auto_enabled.get()),
             master_prob=float(self.auto_master_prob.get()) / 100.0,
@@ -742,7 +974,7 @@ class App(ttk.Frame):
         self.cancel_btn.configure(state="normal")
 
     def _cancel(self):
-        self._cancel_batch = True
+        self._cancel_batch.set()
         self._set_status("Cancelling…", "")
 
     def generate(self):
@@ -772,58 +1004,102 @@ class App(ttk.Frame):
         force_1girl = bool(self.force_1girl.get())
         negative = self.negative_tags.get().strip()
 
-        tuning = self._auto_tuning_obj()
+        # One audit snapshot for the whole batch
+        tuning = self._auto_tuning_obj(audit=self._audit())
 
-        # Setup batch
-        self._cancel_batch = False
+        # Setup batch; a new run supersedes one still in flight
+        self._cancel_batch.set()
+        self._cancel_batch = threading.Event()
         self._set_progress(0, n)
-        t0 = time.time()
-
-        prompts = []
 
-        def step(i):
-            if self._cancel_batch:
-                self._set_progress(0, 0)
-                self._set_status("Cancelled", "")
-                return
-
-            # decide seed for this prompt
-            if seed0 is None:
-                seed = None
-            else:
-                if self.lock_seed.get():
-                    seed = seed0
-                else:
-                    seed = seed0 + i if self.increment_seed.get() else seed0
-
-            p = apg.generate_prompt(
+        job = {
+            "n": n,
+            "seed0": seed0,
+            "lock_seed": bool(self.lock_seed.get()),
+            "increment_seed": bool(self.increment_seed.get()),
+            "kwargs": dict(
                 genre=genre,
-                seed=seed,
                 extra_words=extra,
                 distance_preset=distance,
                 force_1girl=force_1girl,
                 quality_preset=quality,
                 extra_pools_tuning=tuning,
-            )
-
-            if negative:
-                p = p + f" | NEGATIVE: {negative}"
-
-            prompts.append(p)
-            self._set_progress(i + 1, n)
-
-            if i + 1 < n:
-                self.master.after(1, lambda: step(i + 1))
+            ),
+            "negative": negative,
+            "cancel": self._cancel_batch,
+            "prompts": [],
+            "progress_step": max(1, n // 100),
+            "progress_shown": 0,
+            "t0": time.time(),
+        }
+        self._gen_job = job
+        self._gen_jobs.put(job)
+        if self._gen_poll_id is None:
+            self._gen_poll_id = self.master.after(GEN_POLL_MS, self._drain_gen_results)
+
+    def _gen_worker_loop(self):
+        # Worker thread: never touches Tk; only reads the job snapshot
+        while True:
+            job = self._gen_jobs.get()
+            for i in range(job["n"]):
+                if job["cancel"].is_set():
+                    self._gen_results.put(("cancelled", job, None))
+                    break
+                try:
+                    p = _generate_one(i, job)
+                except Exception as e:
+                    self._gen_results.put(("error", job, e))
+                    break
+                self._gen_results.put(("prompt", job, p))
             else:
+                self._gen_results.put(("done", job, None))
+
+    def _drain_gen_results(self):
+        self._gen_poll_id = None
+        job = self._gen_job
+        finished = False
+        while True:
+            try:
+                kind, src, payload = self._gen_results.get_nowait()
+            except queue.Empty:
+                break
+            if src is not job:
+                continue  # leftovers from a superseded run
+            if kind == "prompt":
+                job["prompts"].append(payload)
+            elif kind == "cancelled":
                 self._set_progress(0, 0)
-                dt = time.time() - t0
-                joined = "\n".join(prompts)
-                self.current_prompt = joined
-                self.output_text.set_prompt(joined, extra_markers=["NEGATIVE:"])
-                self._push_history(prompts, genre=genre, seed=seed0, n=n)
-                self._set_status("Generated", f"{n} prompt(s) in {dt:.2f}s")
-
-        step(0)
+                self._set_status("Cancelled", "")
+                finished = True
+            elif kind == "error":
+                self._set_progress(0, 0)
+                self._set_status("Generate failed", str(payload))
+                finished = True
+            elif kind == "done":
+                self._finish_batch(job)
+                finished = True
+
+        if finished:
+            self._gen_job = None
+            return
+        if job is not None:
+            # Only touch the progressbar once per ~1% of the batch
+            done = len(job["prompts"])
+            if done - job["progress_shown"] >= job["progress_step"]:
+                job["progress_shown"] = done
+                self._set_progress(done, job["n"])
+            self._gen_poll_id = self.master.after(GEN_POLL_MS, self._drain_gen_results)
+
+    def _finish_batch(self, job):
+        prompts = job["prompts"]
+        n = job["n"]
+        self._set_progress(0, 0)
+        dt = time.time() - job["t0"]
+        joined = "\n".join(prompts)
+        self.current_prompt = joined
+        self.output_text.set_prompt(joined, extra_markers=["NEGATIVE:"])
+        self._push_history(prompts, genre=job["kwargs"]["genre"], seed=job["seed0"], n=n)
+        self._set_status("Generated", f"{n} prompt(s) in {dt:.2f}s")
 
     def _push_history(self, prompts, genre, seed, n):
         ts = time.strftime("%Y-%m-%d %H:%M:%S")
@@ -837,10 +1113,19 @@ class App(ttk.Frame):
         self.history.append(item)
         label = f"[{ts}] {genre} | seed={seed if seed is not None else '—'} | x{n}"
         self.history_list.insert("end", label)
+        # deque dropped its oldest entry; keep the listbox rows aligned
+        if self.history_list.size() > len(self.history):
+            self.history_list.delete(0)
 
     # ---------- copy/save ----------
+    def _current_text(self):
+        # Skip the Tk -> Python round trip unless the user edited the output box
+        if self.current_prompt and not self.output_text.edit_modified():
+            return self.current_prompt.strip()
+        return self.output_text.get("1.0", "end-1c").strip()
+
     def _copy_current(self):
-        txt = self.output_text.get("1.0", "end-1c").strip()
+        txt = self._current_text()
         if not txt:
             return
         self.master.clipboard_clear()
@@ -852,9 +1137,7 @@ class App(ttk.Frame):
             self._copy_current()
             return
         # copy all prompts in history
-        all_prompts = []
-        for h in self.history:
-            all_prompts.extend(h["prompts"])
+        all_prompts = list(chain.from_iterable(h["prompts"] for h in self.history))
         txt = "\n".join(all_prompts).strip()
         if not txt:
             return
@@ -863,7 +1146,7 @@ class App(ttk.Frame):
         self._set_status("Copied all history", f"{len(all_prompts)} prompt(s)")
 
     def _save_output(self):
-        txt = self.output_text.get("1.0", "end-1c").strip()
+        txt = self._current_text()
         if not txt:
             messagebox.showerror("Nothing to save", "Generate something first.")
             return
@@ -877,10 +1160,10 @@ class App(ttk.Frame):
         try:
             if path.lower().endswith(".json"):
                 prompts = [line for line in txt.splitlines() if line.strip()]
-                with open(path, "w", encoding="utf-8") as f:
-                    json.dump({"prompts": prompts}, f, ensure_ascii=False, indent=2)
+                with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+                    f.write(json.dumps({"prompts": prompts}, ensure_ascii=False, indent=2))
             else:
-                with open(path, "w", encoding="utf-8") as f:
+                with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
                     f.write(txt + "\n")
             self._set_status("Saved", os.path.basename(path))
         except Exception as e:
@@ -908,7 +1191,7 @@ class App(ttk.Frame):
         self._set_status("History cleared", "")
 
     def _favorite_current(self):
-        txt = self.output_text.get("1.0", "end-1c").strip()
+        txt = self._current_text()
         if not txt:
             return
         ts = time.strftime("%Y-%m-%d %H:%M:%S")
@@ -956,14 +1239,12 @@ class App(ttk.Frame):
             return
         try:
             if path.lower().endswith(".txt"):
-                lines = []
-                for h in self.history:
-                    lines.extend(h["prompts"])
-                with open(path, "w", encoding="utf-8") as f:
+                lines = list(chain.from_iterable(h["prompts"] for h in self.history))
+                with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
                     f.write("\n".join(lines) + "\n")
             else:
-                with open(path, "w", encoding="utf-8") as f:
-                    json.dump({"history": self.history}, f, ensure_ascii=False, indent=2)
+                with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+                    f.write(json.dumps({"history": list(self.history)}, ensure_ascii=False, indent=2))
             self._set_status("Exported history", os.path.basename(path))
         except Exception as e:
             messagebox.showerror("Export failed", str(e))
@@ -981,11 +1262,11 @@ class App(ttk.Frame):
             return
         try:
             if path.lower().endswith(".txt"):
-                with open(path, "w", encoding="utf-8") as f:
+                with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
                     f.write("\n\n".join([x["text"] for x in self.favorites]) + "\n")
             else:
-                with open(path, "w", encoding="utf-8") as f:
-                    json.dump({"favorites": self.favorites}, f, ensure_ascii=False, indent=2)
+                with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+                    f.write(json.dumps({"favorites": self.favorites}, ensure_ascii=False, indent=2))
             self._set_status("Exported favorites", os.path.basename(path))
         except Exception as e:
             messagebox.showerror("Export failed", str(e))
@@ -994,23 +1275,29 @@ class App(ttk.Frame):
     def _append_extra(self, tag: str):
         cur = self.extra_tags.get().strip()
         parts = [p.strip() for p in cur.split(",") if p.strip()]
-        low = {p.lower() for p in parts}
-        if tag.lower() not in low:
-            parts.append(tag)
+        if tag.lower() in {p.lower() for p in parts}:
+            return  # already present; leave the field (and its traces) alone
+        parts.append(tag)
         self.extra_tags.set(", ".join(parts))
 
     def _apply_ova_mode(self):
-        cur = self.extra_tags.get().strip()
-        parts = [p.strip() for p in cur.split(",") if p.strip()]
+        cur = self.extra_tags.get()
+        parts, lows = [], []
+        for p in cur.split(","):
+            p = p.strip()
+            if p:
+                parts.append(p)
+                lows.append(p.lower())
         if self.ova_locked.get():
-            low = {p.lower() for p in parts}
-            for t in OVA_ANCHOR_TAGS:
-                if t.lower() not in low:
+            low = set(lows)
+            for t, tl in zip(OVA_ANCHOR_TAGS, _OVA_LOWER):
+                if tl not in low:
                     parts.append(t)
         else:
-            ova_set = {t.lower() for t in OVA_ANCHOR_TAGS}
-            parts = [p for p in parts if p.lower() not in ova_set]
-        self.extra_tags.set(", ".join(parts))
+            parts = [p for p, pl in zip(parts, lows) if pl not in OVA_ANCHORS]
+        new = ", ".join(parts)
+        if new != cur:
+            self.extra_tags.set(new)
 
     def _preset_ova(self):
         self.ova_locked.set(True)
@@ -1062,8 +1349,8 @@ class App(ttk.Frame):
         self._refresh_auto_file_list()
         self._set_status("Reset", "Defaults")
 
-    def _collect_preset_state(self):
-        audit = apg.data_audit()
+    def _collect_preset_state(self, audit=None):
+        audit = audit or self._audit()
         unused = cast(List[str], audit["unused"])
         per = {}
         for fn in unused:
@@ -1141,7 +1428,7 @@ class App(ttk.Frame):
         self._refresh_auto_file_list()
 
     def _save_preset(self):
-        st = self._collect_preset_state()
+        st = self._collect_preset_state(audit=self._audit())
         path = filedialog.asksaveasfilename(
             title="Save preset",
             defaultextension=".json",
@@ -1150,8 +1437,8 @@ class App(ttk.Frame):
         if not path:
             return
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(st, f, ensure_ascii=False, indent=2)
+            with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+                f.write(json.dumps(st, ensure_ascii=False, indent=2))
             self._set_status("Preset saved", os.path.basename(path))
         except Exception as e:
             messagebox.showerror("Save failed", str(e))
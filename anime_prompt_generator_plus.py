@@ -23,7 +23,7 @@ import random
 import re
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, TypedDict
+from typing import Dict, List, Optional, Sequence, Tuple, TypedDict
 
 import anime_prompt_generator_v6_5_1 as base
 
@@ -43,7 +43,7 @@ def get_data_dir() -> str:
 
 
 def set_data_dir(path: str) -> None:
-    global _DATA_DIR, DATA_DIR
+    global _DATA_DIR, DATA_DIR, _EXTRA_POOLS
     _DATA_DIR = path
     DATA_DIR = path
 
@@ -53,12 +53,8 @@ def set_data_dir(path: str) -> None:
             return _DATA_DIR
         base.get_data_path = _patched_get_data_path  # type: ignore
 
-    # Refresh extra pools if the loader is available
-    if "_reload_extra_pools" in globals():
-        try:
-            _reload_extra_pools()
-        except Exception:
-            pass
+    # Extra pools reload lazily on next use
+    _EXTRA_POOLS = None
 
 
 # Apply once at import time so it works even before the GUI calls Reload
@@ -75,20 +71,38 @@ class DataAudit(TypedDict):
     unused: List[str]
 
 # ---- audit ----
+_USED_TXT_RE = re.compile(r"""["']([A-Za-z0-9_\-]+\.txt)["']""")
+
+# path -> (mtime, sorted names); a rescan only happens after the file/dir changes
+_USED_TXT_CACHE: Dict[str, Tuple[float, List[str]]] = {}
+_FOUND_TXT_CACHE: Dict[str, Tuple[int, List[str]]] = {}
+
 def _scan_used_txt_filenames() -> List[str]:
     try:
         src_path = base.__file__
+        mtime = os.path.getmtime(src_path)
+        hit = _USED_TXT_CACHE.get(src_path)
+        if hit is not None and hit[0] == mtime:
+            return list(hit[1])
         with open(src_path, "r", encoding="utf-8") as f:
             src = f.read()
     except Exception:
         return []
-    return sorted(set(re.findall(r'["\\\']([A-Za-z0-9_\-]+\.txt)["\\\']', src)))
+    used = sorted(set(_USED_TXT_RE.findall(src)))
+    _USED_TXT_CACHE[src_path] = (mtime, used)
+    return list(used)
 
 def _scan_found_txt_filenames(data_dir: str) -> List[str]:
     try:
-        return sorted([n for n in os.listdir(data_dir) if n.lower().endswith(".txt")])
+        mtime = os.stat(data_dir).st_mtime_ns
+        hit = _FOUND_TXT_CACHE.get(data_dir)
+        if hit is not None and hit[0] == mtime:
+            return list(hit[1])
+        found = sorted([n for n in os.listdir(data_dir) if n.lower().endswith(".txt")])
     except FileNotFoundError:
         return []
+    _FOUND_TXT_CACHE[data_dir] = (mtime, found)
+    return list(found)
 
 def data_audit(data_dir: Optional[str] = None) -> DataAudit:
     d = data_dir or _DATA_DIR
@@ -106,35 +120,66 @@ def data_audit(data_dir: Optional[str] = None) -> DataAudit:
     }
 
 
+# data_dir -> ((dir mtime, generator source mtime), audit)
+_AUDIT_CACHE: Dict[str, Tuple[tuple, DataAudit]] = {}
+
+def data_audit_cached(data_dir: Optional[str] = None) -> DataAudit:
+    """data_audit(), reused until the data dir or the generator source changes.
+
+    The returned dict is shared between callers; treat it as read-only.
+    """
+    d = data_dir or _DATA_DIR
+    try:
+        key = (os.stat(d).st_mtime_ns, os.path.getmtime(base.__file__))
+    except OSError:
+        return data_audit(d)
+    hit = _AUDIT_CACHE.get(d)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    audit = data_audit(d)
+    _AUDIT_CACHE[d] = (key, audit)
+    return audit
+
+
 # ---- extra pools ----
-_EXTRA_POOLS: Dict[str, List[str]] = {}  # filename -> items (unused only)
+# filename -> items (unused only); None until first use after a data dir change
+_EXTRA_POOLS: Optional[Dict[str, Tuple[str, ...]]] = None
 
-def _load_list_file(data_dir: str, filename: str) -> List[str]:
+def _load_list_file(data_dir: str, filename: str) -> Tuple[str, ...]:
     path = os.path.join(data_dir, filename)
     out: List[str] = []
+    intern = sys.intern
     try:
         with open(path, "r", encoding="utf-8") as f:
             for line in f:
                 s = line.strip()
                 if not s or s.startswith("#"):
                     continue
-                out.append(s)
+                out.append(intern(s))
     except FileNotFoundError:
         pass
-    return out
+    return tuple(out)
 
 def _reload_extra_pools() -> None:
     global _EXTRA_POOLS
     audit = data_audit(_DATA_DIR)
-    pools: Dict[str, List[str]] = {}
+    pools: Dict[str, Tuple[str, ...]] = {}
     for fn in audit["unused"]:
         items = _load_list_file(_DATA_DIR, fn)
         if items:
             pools[fn] = items
     _EXTRA_POOLS = pools
 
+def _extra_pools() -> Dict[str, Tuple[str, ...]]:
+    if _EXTRA_POOLS is None:
+        try:
+            _reload_extra_pools()
+        except Exception:
+            return {}
+    return _EXTRA_POOLS  # type: ignore[return-value]
+
 def list_extra_pool_files() -> List[str]:
-    return sorted(_EXTRA_POOLS.keys())
+    return sorted(_extra_pools().keys())
 
 
 @dataclass
@@ -145,56 +190,77 @@ class ExtraPoolsTuning:
     per_file_prob: Dict[str, float] = field(default_factory=dict)  # fn -> 0..1
 
 
+# Resolved once; _append_extra_pools runs per prompt
+_BASE_CLEAN = getattr(base, "clean_prompt", None)
+
+
+def _merge_dedupe_csv(prompt: str, extras: Sequence[str] = ()) -> str:
+    """Dedupe prompt's comma parts plus extras in one pass, without re-joining first."""
+    # lowercased key -> first-seen spelling; dicts keep insertion order
+    out: Dict[str, str] = {}
+    for src in (prompt, *extras):
+        for p in src.split(","):
+            p = p.strip()
+            if not p:
+                continue
+            k = p.lower()
+            if k not in out:
+                out[k] = p
+    return ", ".join(out.values())
+
 def _dedupe_csv(prompt: str) -> str:
-    parts = [p.strip() for p in prompt.split(",") if p.strip()]
-    seen = set()
-    out = []
-    for p in parts:
-        k = p.lower()
-        if k in seen:
+    return _merge_dedupe_csv(prompt)
+
+def _active_pool_probs(tuning: ExtraPoolsTuning) -> List[Tuple[str, float, Tuple[str, ...]]]:
+    """(filename, clamped prob, items) for every loaded pool with a slider above 0."""
+    out: List[Tuple[str, float, Tuple[str, ...]]] = []
+    for fn, items in _extra_pools().items():
+        p = float(tuning.per_file_prob.get(fn, 0.0) or 0.0)
+        if p <= 0:
             continue
-        seen.add(k)
-        out.append(p)
-    return ", ".join(out)
+        out.append((fn, max(0.0, min(1.0, p)), items))
+    return out
 
-def _append_extra_pools(prompt: str, tuning: ExtraPoolsTuning) -> str:
-    if not tuning.enabled or not _EXTRA_POOLS:
+def _append_extra_pools(
+    prompt: str,
+    tuning: ExtraPoolsTuning,
+    active: Optional[List[Tuple[str, float, Tuple[str, ...]]]] = None,
+) -> str:
+    if not tuning.enabled or not _extra_pools():
+        return prompt
+    # Enabled but every slider at 0: nothing to add, skip the master draw too
+    if active is None:
+        if not any(tuning.per_file_prob.values()):
+            return prompt
+        active = _active_pool_probs(tuning)
+    if not active:
         return prompt
     if random.random() > max(0.0, min(1.0, tuning.master_prob)):
         return prompt
 
-    candidates: List[str] = []
-    for fn in _EXTRA_POOLS.keys():
-        p = float(tuning.per_file_prob.get(fn, 0.0) or 0.0)
-        if p <= 0:
-            continue
-        if random.random() < max(0.0, min(1.0, p)):
-            candidates.append(fn)
+    # One independent draw per active file, in pool order (keeps seeded output stable)
+    rnd = random.random
+    candidates = [e for e in active if rnd() < e[1]]
 
     if not candidates:
         return prompt
 
     k = max(1, int(tuning.max_extra_tags))
     k = min(k, len(candidates))
-    chosen_files = random.sample(candidates, k=k)
+    chosen = random.sample(candidates, k=k)
 
-    extras: List[str] = []
-    for fn in chosen_files:
-        items = _EXTRA_POOLS.get(fn, [])
-        if items:
-            extras.append(random.choice(items))
+    extras = [random.choice(items) for _fn, _p, items in chosen if items]
 
     if not extras:
         return prompt
 
-    combined = prompt + ", " + ", ".join(extras)
     # Prefer base.clean_prompt if it exists
-    if hasattr(base, "clean_prompt"):
+    if _BASE_CLEAN is not None:
         try:
-            return base.clean_prompt(combined)
+            return _BASE_CLEAN(prompt + ", " + ", ".join(extras))
         except Exception:
-            return _dedupe_csv(combined)
-    return _dedupe_csv(combined)
+            pass
+    return _merge_dedupe_csv(prompt, extras)
 
 
 # ---- genres ----
@@ -221,12 +287,11 @@ def generate_prompt(
     quality_preset: str = "ultra",
     extra_pools_tuning: Optional[ExtraPoolsTuning] = None,
 ) -> str:
-    if seed is not None:
-        random.seed(int(seed))
-
+    # base.generate_prompt seeds the global RNG itself; the extra pools then
+    # continue that same stream, so seeded output stays reproducible.
     prompt = base.generate_prompt(
         genre=genre,
-        seed=seed,
+        seed=int(seed) if seed is not None else None,
         extra_words=extra_words,
         distance_preset=distance_preset,
         force_1girl=force_1girl,
@@ -238,8 +303,38 @@ def generate_prompt(
     return prompt
 
 
-# Init
-_reload_extra_pools()
+def generate_prompts(
+    count: int,
+    genre: str = "random",
+    seed: Optional[int] = None,
+    extra_words: str = "",
+    distance_preset: str = "random",
+    force_1girl: bool = False,
+    quality_preset: str = "ultra",
+    extra_pools_tuning: Optional[ExtraPoolsTuning] = None,
+) -> List[str]:
+    """Batch form of generate_prompt(); prompt i uses seed + i when a seed is given.
+
+    Tuning and the active extra-pool list are resolved once for the whole batch.
+    """
+    tuning = extra_pools_tuning or ExtraPoolsTuning()
+    active = _active_pool_probs(tuning) if tuning.enabled else None
+    base_generate = base.generate_prompt
+
+    out: List[str] = []
+    for i in range(count):
+        s = int(seed + i) if seed is not None else None
+        prompt = base_generate(
+            genre=genre,
+            seed=s,
+            extra_words=extra_words,
+            distance_preset=distance_preset,
+            force_1girl=force_1girl,
+            quality_preset=quality_preset,
+        )
+        out.append(_append_extra_pools(prompt, tuning, active))
+    return out
+
 
 if __name__ == "__main__":
     print(generate_prompt())
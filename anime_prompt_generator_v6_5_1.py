@@ -9,10 +9,21 @@ Now with external data files for easy expansion!
 Add more entries to any .txt file in the data/ folder (one per line)
 """
 
+import bisect
+import functools
+import itertools
 import random
 import os
 import re
-from typing import List, Optional, Tuple, Dict
+import sys
+from typing import List, Optional, Sequence, Tuple, Dict
+
+# Coin flips go through the module-level generator, so random.seed() still
+# governs them; binding the methods once skips the attribute lookup per flip/pick.
+# Flips are drawn one at a time, interleaved with choice()/sample(): a
+# pre-drawn buffer of uniforms would reorder the stream and change seeded output.
+_urand = random.random
+_choice = random.choice
 
 # ============================================================
 # PAIRING MODE (Scene coherence)
@@ -44,7 +55,7 @@ def _try_spike() -> bool:
         return False
     if SPIKE_BUDGET <= 0:
         return False
-    if random.random() < WILD_SPIKE_CHANCE:
+    if _urand() < WILD_SPIKE_CHANCE:
         SPIKE_BUDGET -= 1
         return True
     return False
@@ -63,7 +74,13 @@ def get_data_path() -> str:
     """Get the path to the data folder (same directory as this script)"""
     return os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 
-def load_list(filename: str) -> List[str]:
+# One item per line: first char not '#'/space, text up to an inline '#'
+_LIST_LINE_RE = re.compile(r'^[^\S\n]*([^#\s][^#\n]*)', re.MULTILINE)
+
+# Shared placeholder for missing/empty files; checked by identity
+_MISSING_LIST: Tuple[str, ...] = ("default",)
+
+def load_list(filename: str) -> Tuple[str, ...]:
     """
     Load a list from a text file (one item per line)
     Ignores empty lines and lines starting with #
@@ -71,19 +88,16 @@ def load_list(filename: str) -> List[str]:
     filepath = os.path.join(get_data_path(), filename)
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
-            items = []
-            for line in f:
-                line = line.strip()
-                # Allow inline comments: 'tag  # comment'
-                if '#' in line and not line.lstrip().startswith('#'):
-                    line = line.split('#', 1)[0].strip()
-                # Skip empty lines and full-line comments
-                if line and not line.startswith('#'):
-                    items.append(line)
-            return items if items else ["default"]
+            data = f.read()
+        # Regex skips blank/comment lines and cuts inline '# comment' tails;
+        # interned so a tag repeated across files is one shared string;
+        # tuples since the lists are read-only once loaded
+        intern = sys.intern
+        items = tuple([intern(m.strip()) for m in _LIST_LINE_RE.findall(data)])
+        return items if items else _MISSING_LIST
     except FileNotFoundError:
         print(f"Warning: {filename} not found, using defaults")
-        return ["default"]
+        return _MISSING_LIST
 
 def load_dict(filename: str) -> Dict[str, str]:
     """
@@ -107,6 +121,10 @@ def load_dict(filename: str) -> Dict[str, str]:
 # ============================================================
 # LOAD ALL DATA FROM FILES
 # ============================================================
+# Loaded eagerly on purpose: the generators read these as bare module globals
+# (a PEP 562 module __getattr__ only covers `module.NAME` access from outside),
+# GENRE_WEIGHTS / ALL_CLOTHING below concatenate them at import, and a single
+# generate_prompt() touches nearly every list anyway.
 
 # Colors
 CLOTHING_COLORS = load_list("colors_clothing.txt")
@@ -116,6 +134,11 @@ UNDERWEAR_COLORS = load_list("colors_underwear.txt")
 UNDERWEAR_PATTERNS = load_list("underwear_patterns.txt")
 UNDERWEAR_STYLES = load_list("underwear_styles.txt")
 MATERIAL_TYPES = load_list("materials.txt")
+# Fabric-like materials for generate_outfit (no latex/vinyl/pvc); all of them if none qualify
+SAFE_MATERIAL_TYPES = tuple(
+    m for m in MATERIAL_TYPES
+    if m and not any(bad in m.lower() for bad in ("latex", "vinyl", "pvc"))
+) or MATERIAL_TYPES
 
 # Hair
 HAIR_COLORS = load_list("hair_colors.txt")
@@ -332,34 +355,52 @@ QUALITY_PRESETS = {
     "artistic": "masterpiece, best quality, absurdres, very aesthetic, artistic",
 }
 
-def _has_real_list(lst: List[str]) -> bool:
+def _has_real_list(lst: Sequence[str]) -> bool:
     """True if a loaded list is present and not the default placeholder."""
-    return bool(lst) and lst != ["default"]
+    return bool(lst) and lst is not _MISSING_LIST
+
+# Optional packs are fixed after import; resolve their presence once
+_HAS_QUALITY_SCAFFOLD = _has_real_list(QUALITY_SCAFFOLD_ILLUSTRIOUS)
+_HAS_OPTICS = _has_real_list(OPTICS_BOKEH)
+
+# Scaffold odds per quality preset, and the usable scaffolds (short = <= 4 tokens)
+_SCAFFOLD_PROB = {
+    "ultra": 0.70,
+    "high": 0.60,
+    "standard": 0.45,
+    "artistic": 0.25,
+}
+_SCAFFOLDS = tuple(s for s in QUALITY_SCAFFOLD_ILLUSTRIOUS if s and s != "default")
+_SCAFFOLDS_SHORT = tuple(s for s in _SCAFFOLDS if s.count(",") <= 3)
+
+# Optics odds per distance preset; prefer 1-2 token entries to avoid bloat
+_OPTICS_PROB = {
+    "face_closeup": 0.46,
+    "portrait": 0.44,
+    "half_body": 0.38,
+    "full_body": 0.26,
+    "wide_scene": 0.16,
+    "random": 0.30,
+}
+_OPTICS_ALL = tuple(s for s in OPTICS_BOKEH if s and s != "default")
+_OPTICS_POOL = tuple(s for s in _OPTICS_ALL if s.count(",") <= 1) or _OPTICS_ALL
 
 
 def _pick_quality_scaffold(quality_preset: str) -> str:
     """Pick a single Illustrious-friendly quality scaffold without bloating prompts."""
     base = QUALITY_PRESETS.get(quality_preset, QUALITY_PRESETS["ultra"])
-    if not _has_real_list(QUALITY_SCAFFOLD_ILLUSTRIOUS):
+    if not _HAS_QUALITY_SCAFFOLD:
         return base
 
-    p = {
-        "ultra": 0.70,
-        "high": 0.60,
-        "standard": 0.45,
-        "artistic": 0.25,
-    }.get(quality_preset, 0.55)
+    p = _SCAFFOLD_PROB.get(quality_preset, 0.55)
 
-    if random.random() < p:
-        scaff = [s for s in QUALITY_SCAFFOLD_ILLUSTRIOUS if s and s != "default"]
-        if not scaff:
+    if _urand() < p:
+        if not _SCAFFOLDS:
             return base
         if quality_preset == "artistic":
             # Prefer shorter scaffolds in artistic mode
-            short = [s for s in scaff if s.count(",") <= 3]
-            if short:
-                return random.choice(short)
-        return random.choice(scaff)
+            return _choice(_SCAFFOLDS_SHORT or _SCAFFOLDS)
+        return _choice(_SCAFFOLDS)
 
     return base
 
@@ -414,60 +455,62 @@ _TIME_KEYS = list(TIME_OF_DAY.keys())
 
 
 
+# time_key -> variant tuple, or None when the data file is missing/placeholder
+_TIME_VARIANT_TUPLES: Dict[str, Optional[Tuple[str, ...]]] = {
+    k: (v if _has_real_list(v) else None) for k, v in TIME_VARIANTS.items()
+}
+
 def _time_tag(time_key: str) -> str:
     """Return a time-of-day tag string. Uses data/time_*.txt variants if present."""
-    variants = TIME_VARIANTS.get(time_key) if 'TIME_VARIANTS' in globals() else None
-    if variants and variants != ["default"]:
-        return random.choice(variants)
-    return TIME_OF_DAY.get(time_key, TIME_OF_DAY["night"])
+    variants = _TIME_VARIANT_TUPLES.get(time_key)
+    return _choice(variants) if variants else TIME_OF_DAY.get(time_key, TIME_OF_DAY["night"])
+
 
+_INDOOR_KW = ("bedroom", "bathroom", "shower", "bathtub", "room", "apartment", "living room", "kitchen", "cafe", "classroom", "library", "hallway", "locker", "changing room", "hotel", "office", "train car", "subway car", "elevator")
+_OUTDOOR_KW = ("street", "alley", "rooftop", "park", "beach", "shore", "pier", "forest", "mountain", "river", "lake", "field", "garden", "courtyard", "balcony", "bridge", "station platform", "festival", "market", "sidewalk", "crosswalk", "stairs outside", "sky", "outdoors")
+_INDOOR_RE = re.compile("|".join(map(re.escape, _INDOOR_KW)))
+_OUTDOOR_RE = re.compile("|".join(map(re.escape, _OUTDOOR_KW)))
 
+# Bucket hints: nature/urban/cyberpunk are often outdoors (not always), cozy/ecchi indoors
+_LIKELY_OUTDOOR = {
+    "nature": True, "urban_day": True, "urban_night": True, "cyberpunk": True,
+    "historical": True, "fantasy": True,
+}
+
+# Location tags come from the fixed lists, so repeat lookups are frequent
+@functools.lru_cache(maxsize=1024)
 def _is_outdoor(location_type: str, location_tag: str) -> bool:
     """Heuristic: decide if scene is outdoor to control sky/weather density."""
-    # Bucket hints
-    if location_type in ("nature", "urban_day", "urban_night", "cyberpunk"):
-        # these are often outdoors, but not always
-        likely_outdoor = True
-    elif location_type in ("cozy", "ecchi"):
-        likely_outdoor = False
-    else:
-        likely_outdoor = location_type in ("historical", "fantasy")
-
     t = (location_tag or "").lower()
-    outdoor_kw = ["street", "alley", "rooftop", "park", "beach", "shore", "pier", "forest", "mountain", "river", "lake", "field", "garden", "courtyard", "balcony", "bridge", "station platform", "festival", "market", "sidewalk", "crosswalk", "stairs outside", "sky", "outdoors"]
-    indoor_kw = ["bedroom", "bathroom", "shower", "bathtub", "room", "apartment", "living room", "kitchen", "cafe", "classroom", "library", "hallway", "locker", "changing room", "hotel", "office", "train car", "subway car", "elevator"]
-
-    if any(k in t for k in indoor_kw):
+    if _INDOOR_RE.search(t):
         return False
-    if any(k in t for k in outdoor_kw):
+    if _OUTDOOR_RE.search(t):
         return True
-    return likely_outdoor
-
+    return _LIKELY_OUTDOOR.get(location_type, False)
+
+
+# Hint keywords per time key (the _coherent_* pickers filter their pools with these)
+_SKY_TIME_HINTS = {
+    "night": ("night", "star", "moon", "milky"),
+    "midnight": ("night", "star", "moon", "milky"),
+    "dawn": ("dawn", "sunrise", "pink", "peach", "horizon"),
+    "morning": ("morning", "blue", "clear", "fresh"),
+    "noon": ("noon", "midday", "blue", "bright", "summer", "heat"),
+    "afternoon": ("afternoon", "warm", "haze", "azure"),
+    "golden_hour": ("sunset", "twilight", "orange", "purple", "afterglow", "lavender"),
+    "dusk": ("sunset", "twilight", "orange", "purple", "afterglow", "lavender"),
+}
 
-def _coherent_sky(sky_list: List[str], time_key: str, location_type: str) -> Optional[str]:
+def _coherent_sky(sky_list: Sequence[str], time_key: str, location_type: str) -> Optional[str]:
     """Pick a sky descriptor; more likely outdoors, filtered by time-of-day keywords."""
     if not sky_list:
         return None
     # Only add sky for outdoor-ish scenes (or occasionally if indoor with windows)
     # Probability is handled by caller.
-    hints = []
-    if time_key in ("night", "midnight"):
-        hints += ["night", "star", "moon", "milky"]
-    elif time_key in ("dawn",):
-        hints += ["dawn", "sunrise", "pink", "peach", "horizon"]
-    elif time_key in ("morning",):
-        hints += ["morning", "blue", "clear", "fresh"]
-    elif time_key in ("noon",):
-        hints += ["noon", "midday", "blue", "bright", "summer", "heat"]
-    elif time_key in ("afternoon",):
-        hints += ["afternoon", "warm", "haze", "azure"]
-    elif time_key in ("golden_hour", "dusk"):
-        hints += ["sunset", "twilight", "orange", "purple", "afterglow", "lavender"]
-
-    cand = _filter_by_keywords(sky_list, include=hints)
+    cand = _keyword_pool(sky_list, _SKY_TIME_HINTS.get(time_key, ()))
     if cand:
-        return random.choice(cand)
-    return random.choice(sky_list)
+        return _choice(cand)
+    return _choice(sky_list)
 
 
 def _weather_probability(is_ecchi: bool, location_type: str, is_outdoor: bool) -> float:
@@ -478,61 +521,76 @@ def _weather_probability(is_ecchi: bool, location_type: str, is_outdoor: bool) -
     return 0.10 if is_ecchi else 0.25
 
 
+def _weight_slots(items_with_weights: List[Tuple[str, int]]) -> Tuple[str, ...]:
+    """Each item repeated `weight` times; built once per fixed (small-total) weight table."""
+    return tuple(item for item, weight in items_with_weights for _ in range(weight))
+
+def _pick_slot(slots: Tuple[str, ...]) -> str:
+    """Same draw and pick as weighted_choice(); randrange(n) consumes what randint(1, n) does."""
+    return slots[random.randrange(len(slots))]
+
+# Time-of-day weights per scene flavour (see _pick_time_key)
+_TIME_WEIGHTS_INTIMATE = _weight_slots([
+    ("dusk", 14), ("night", 22), ("midnight", 14),
+    ("golden_hour", 10), ("afternoon", 8),
+    ("morning", 6), ("dawn", 6), ("noon", 4)
+])
+_TIME_WEIGHTS_NIGHTLIFE = _weight_slots([
+    ("night", 24), ("dusk", 14), ("midnight", 14),
+    ("golden_hour", 10), ("afternoon", 8),
+    ("morning", 6), ("dawn", 4), ("noon", 4)
+])
+_TIME_WEIGHTS_DEFAULT = _weight_slots([
+    ("morning", 14), ("afternoon", 14), ("golden_hour", 14),
+    ("dawn", 10), ("dusk", 10),
+    ("noon", 10), ("night", 10), ("midnight", 6)
+])
+
 def _pick_time_key(is_ecchi: bool, location_type: str) -> str:
     # Ecchi and cozy scenes lean evening/night a bit; outdoor scenic can stay broad.
     if not _should_pair():
-        return random.choice(_TIME_KEYS)
+        return _choice(_TIME_KEYS)
     if is_ecchi or location_type in ("cozy", "ecchi"):
-        weights = [
-            ("dusk", 14), ("night", 22), ("midnight", 14),
-            ("golden_hour", 10), ("afternoon", 8),
-            ("morning", 6), ("dawn", 6), ("noon", 4)
-        ]
-    elif location_type in ("urban_night", "cyberpunk"):
-        weights = [
-            ("night", 24), ("dusk", 14), ("midnight", 14),
-            ("golden_hour", 10), ("afternoon", 8),
-            ("morning", 6), ("dawn", 4), ("noon", 4)
-        ]
-    else:
-        weights = [
-            ("morning", 14), ("afternoon", 14), ("golden_hour", 14),
-            ("dawn", 10), ("dusk", 10),
-            ("noon", 10), ("night", 10), ("midnight", 6)
-        ]
-    return weighted_choice(weights)
+        return _pick_slot(_TIME_WEIGHTS_INTIMATE)
+    if location_type in ("urban_night", "cyberpunk"):
+        return _pick_slot(_TIME_WEIGHTS_NIGHTLIFE)
+    return _pick_slot(_TIME_WEIGHTS_DEFAULT)
+# Opposing time per key for "swap_time" spikes (night <-> noon, dawn <-> midnight, ...)
+_SPIKE_OPPOSITES = {
+    "night": "noon",
+    "midnight": "morning",
+    "dusk": "noon",
+    "golden_hour": "midnight",
+    "dawn": "night",
+    "morning": "midnight",
+    "noon": "night",
+    "afternoon": "midnight",
+}
+_SPIKE_KINDS = ("swap_time", "swap_location")
+_ALL_CONTRAST = ("fantasy", "cyberpunk", "urban_night", "urban_day", "nature", "historical", "school", "cozy", "modern", "ecchi")
+# location bucket -> every other bucket, in _ALL_CONTRAST order
+_SPIKE_CONTRAST = {lt: tuple(x for x in _ALL_CONTRAST if x != lt) for lt in _ALL_CONTRAST}
+
 def _spike_override(time_key: str, location_type: str) -> Tuple[str, str]:
     # Create intentional but "still plausible" mismatches sometimes.
     if not _try_spike():
         return time_key, location_type
 
     # Spike types
-    spike = random.choice(["swap_time", "swap_location"])
+    spike = _choice(_SPIKE_KINDS)
 
     if spike == "swap_time":
-        # Flip to an opposing time (night <-> noon, dawn <-> midnight, etc.)
-        opposites = {
-            "night": "noon",
-            "midnight": "morning",
-            "dusk": "noon",
-            "golden_hour": "midnight",
-            "dawn": "night",
-            "morning": "midnight",
-            "noon": "night",
-            "afternoon": "midnight",
-        }
-        return opposites.get(time_key, random.choice(_TIME_KEYS)), location_type
+        # Flip to an opposing time; the fallback draw is always made (keeps the RNG stream)
+        return _SPIKE_OPPOSITES.get(time_key, _choice(_TIME_KEYS)), location_type
 
     # swap_location
     # Push location to a contrasting bucket
-    contrast = ["fantasy", "cyberpunk", "urban_night", "urban_day", "nature", "historical", "school", "cozy", "modern", "ecchi"]
-    if location_type in contrast:
-        contrast.remove(location_type)
-    return time_key, random.choice(contrast) if contrast else location_type
-def _coherent_location_type(preset_locations: List[str], time_key: str) -> str:
+    contrast = _SPIKE_CONTRAST.get(location_type, _ALL_CONTRAST)
+    return time_key, _choice(contrast) if contrast else location_type
+def _coherent_location_type(preset_locations: Sequence[str], time_key: str) -> str:
     # Pick a location bucket that fits the time-of-day, but keep genre intent.
     if not _should_pair():
-        return random.choice(preset_locations)
+        return _choice(preset_locations)
 
     nightish = time_key in ("night", "midnight")
     duskish = time_key in ("dusk",)
@@ -554,10 +612,38 @@ def _coherent_location_type(preset_locations: List[str], time_key: str) -> str:
 
     viable = [p for p in preferred if p in preset_locations]
     if viable:
-        return random.choice(viable)
-
-    return random.choice(preset_locations)
-def _filter_by_keywords(items: List[str], include: Optional[List[str]] = None, exclude: Optional[List[str]] = None) -> List[str]:
+        return _choice(viable)
+
+    return _choice(preset_locations)
+# Deletion table for _compact: '-', '_' and every character str.isspace()
+# (the same set a regex \s matches), so no regex runs per string
+_COMPACT_DEL = str.maketrans("", "", (
+    "-_\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680"
+    "\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a"
+    "\u2028\u2029\u202f\u205f\u3000"
+))
+
+@functools.lru_cache(maxsize=4096)
+def _compact(s: str) -> str:
+    """Lowercase with spaces/hyphens/underscores removed ("Street-Light" -> "streetlight")."""
+    return s.lower().translate(_COMPACT_DEL)
+
+@functools.lru_cache(maxsize=256)
+def _keyword_matcher(keywords: Tuple[str, ...]) -> Tuple[Optional["re.Pattern[str]"], Tuple[str, ...]]:
+    """Compile a keyword set once: (regex over compacted text, separator-only keywords).
+
+    A plain substring hit always survives compaction, so one alternation over the
+    compacted keywords replaces both per-keyword scans; keywords that compact to
+    nothing (e.g. " ") can only match the raw lowercased text and are kept aside.
+    """
+    low = [str(k).lower() for k in keywords if k]
+    compacted = {_compact(k) for k in low}
+    compacted.discard("")
+    rx = re.compile("|".join(map(re.escape, sorted(compacted)))) if compacted else None
+    raw_only = tuple(k for k in low if not _compact(k))
+    return rx, raw_only
+
+def _filter_by_keywords(items: Sequence[str], include: Optional[Sequence[str]] = None, exclude: Optional[Sequence[str]] = None) -> List[str]:
     """Filter a list of strings by keyword rules to improve scene coherence.
 
     Matching is intentionally forgiving:
@@ -573,105 +659,125 @@ def _filter_by_keywords(items: List[str], include: Optional[List[str]] = None, e
     if not items:
         return []
 
-    inc_raw = [k for k in (include or []) if k]
-    exc_raw = [k for k in (exclude or []) if k]
-
-    inc = [str(k).lower() for k in inc_raw]
-    exc = [str(k).lower() for k in exc_raw]
-
-    def _compact(s: str) -> str:
-        return re.sub(r"[\s\-_]+", "", s.lower())
-
-    inc_c = [_compact(k) for k in inc]
-    exc_c = [_compact(k) for k in exc]
+    inc = _keyword_matcher(tuple(include)) if include and any(include) else None
+    exc = _keyword_matcher(tuple(exclude)) if exclude and any(exclude) else None
 
     out: List[str] = []
     for s in items:
         if not s:
             continue
         t = str(s)
-        tl = t.lower()
         tc = _compact(t)
 
         if inc:
-            ok = any(k in tl for k in inc) or any(kc and kc in tc for kc in inc_c)
+            rx, raw_only = inc
+            ok = (rx is not None and rx.search(tc) is not None) or (raw_only and any(k in t.lower() for k in raw_only))
             if not ok:
                 continue
         if exc:
-            bad = any(k in tl for k in exc) or any(kc and kc in tc for kc in exc_c)
+            rx, raw_only = exc
+            bad = (rx is not None and rx.search(tc) is not None) or (raw_only and any(k in t.lower() for k in raw_only))
             if bad:
                 continue
 
         out.append(s)
     return out
-def _coherent_lighting(preset_lighting: List[str], time_key: str, location_type: str, is_ecchi: bool) -> str:
+
+# (id(items), include) -> (items, filtered, len); the word lists never change after load,
+# and keeping `items` referenced here stops its id from being reused
+_POOL_CACHE: Dict[Tuple[int, Tuple[str, ...]], Tuple[Sequence[str], Tuple[str, ...], int]] = {}
+
+def _keyword_pool(items: Sequence[str], include: Sequence[str]) -> Tuple[str, ...]:
+    """Memoized _filter_by_keywords(items, include=...) for the fixed module word lists.
+
+    The _coherent_* pickers call this with hints that depend only on
+    (time_key, location_type, is_ecchi), so after warm-up each pick is a dict hit.
+    """
+    key = (id(items), tuple(include))
+    hit = _POOL_CACHE.get(key)
+    if hit is not None and hit[0] is items and len(items) == hit[2]:
+        return hit[1]
+    pool = tuple(_filter_by_keywords(items, include=include))
+    _POOL_CACHE[key] = (items, pool, len(items))
+    return pool
+
+_LIGHTING_NIGHT = ("night", "moon", "starlight", "moonlight", "neon", "streetlight", "lamp", "artificial", "fluorescent", "volumetric", "light shafts")
+_LIGHTING_EVENING = ("sunset", "golden", "warm", "rim", "twilight", "evening", "sunbeam", "rays", "light shafts", "god rays", "volumetric")
+_LIGHTING_MORNING = ("morning", "early", "soft", "window", "sunlight", "daylight", "sunbeam", "rays", "dappled", "god rays")
+_LIGHTING_TIME_HINTS = {
+    "night": _LIGHTING_NIGHT,
+    "midnight": _LIGHTING_NIGHT,
+    "dusk": _LIGHTING_EVENING,
+    "golden_hour": _LIGHTING_EVENING,
+    "dawn": _LIGHTING_MORNING,
+    "morning": _LIGHTING_MORNING,
+    "noon": ("midday", "harsh", "bright", "sunlight", "daylight", "sunbeam", "sun rays", "light shafts", "volumetric sunlight"),
+}
+_LIGHTING_TIME_DEFAULT = ("daylight", "sunlight", "ambient", "window")
+_LIGHTING_LOC_HINTS = {
+    "urban_night": ("neon", "streetlight", "sign", "artificial", "glow"),
+    "cyberpunk": ("neon", "streetlight", "sign", "artificial", "glow"),
+    "cozy": ("lamp", "bedside", "warm", "indoor", "soft"),
+    "ecchi": ("lamp", "bedside", "warm", "indoor", "soft"),
+    "nature": ("sunlight", "ambient", "soft", "dramatic", "dappled", "sunbeam", "rays"),
+    "fantasy": ("sunlight", "ambient", "soft", "dramatic", "dappled", "sunbeam", "rays"),
+    "historical": ("sunlight", "ambient", "soft", "dramatic", "dappled", "sunbeam", "rays"),
+}
+# Ecchi can still be moody indoors
+_LIGHTING_ECCHI_HINTS = ("soft", "warm", "dramatic")
+
+def _coherent_lighting(preset_lighting: Sequence[str], time_key: str, location_type: str, is_ecchi: bool) -> str:
     if not preset_lighting:
         return "default"
     if not _should_pair():
-        return random.choice(preset_lighting)
-
-    # Build a hint list for keyword filtering
-    hints = []
-    if time_key in ("night", "midnight"):
-        hints += ["night", "moon", "starlight", "moonlight", "neon", "streetlight", "lamp", "artificial", "fluorescent", "volumetric", "light shafts"]
-    elif time_key in ("dusk", "golden_hour"):
-        hints += ["sunset", "golden", "warm", "rim", "twilight", "evening", "sunbeam", "rays", "light shafts", "god rays", "volumetric"]
-    elif time_key in ("dawn", "morning"):
-        hints += ["morning", "early", "soft", "window", "sunlight", "daylight", "sunbeam", "rays", "dappled", "god rays"]
-    elif time_key == "noon":
-        hints += ["midday", "harsh", "bright", "sunlight", "daylight", "sunbeam", "sun rays", "light shafts", "volumetric sunlight"]
-    else:
-        hints += ["daylight", "sunlight", "ambient", "window"]
+        return _choice(preset_lighting)
 
-    # Location nudges
-    if location_type in ("urban_night", "cyberpunk"):
-        hints += ["neon", "streetlight", "sign", "artificial", "glow"]
-    if location_type in ("cozy", "ecchi"):
-        hints += ["lamp", "bedside", "warm", "indoor", "soft"]
-    if location_type in ("nature", "fantasy", "historical"):
-        hints += ["sunlight", "ambient", "soft", "dramatic", "dappled", "sunbeam", "rays"]
-
-    # Ecchi can still be moody indoors
+    # Hint list for keyword filtering: time, then location nudges, then ecchi mood
+    hints = _LIGHTING_TIME_HINTS.get(time_key, _LIGHTING_TIME_DEFAULT) + _LIGHTING_LOC_HINTS.get(location_type, ())
     if is_ecchi:
-        hints += ["soft", "warm", "dramatic"]
+        hints += _LIGHTING_ECCHI_HINTS
 
-    cand = _filter_by_keywords(preset_lighting, include=hints)
+    cand = _keyword_pool(preset_lighting, hints)
     if cand:
-        return random.choice(cand)
+        return _choice(cand)
 
     # If no keyword match, just pick from the preset
-    return random.choice(preset_lighting)
+    return _choice(preset_lighting)
 
 def _pick_optics(distance_preset: str, is_ecchi: bool) -> Optional[str]:
     """Optional bokeh/DoF optics tag. Keeps output compact (0-1 optics line)."""
-    if not _has_real_list(OPTICS_BOKEH):
+    if not _HAS_OPTICS:
         return None
 
     dp = (distance_preset or "random").strip().lower()
-    prob_map = {
-        "face_closeup": 0.46,
-        "portrait": 0.44,
-        "half_body": 0.38,
-        "full_body": 0.26,
-        "wide_scene": 0.16,
-        "random": 0.30,
-    }
-    p = prob_map.get(dp, 0.28)
+    p = _OPTICS_PROB.get(dp, 0.28)
     if is_ecchi:
         p = min(0.50, p + 0.05)
 
-    if random.random() > p:
+    if _urand() > p:
         return None
 
     # Prefer shorter entries (avoid bloat): mostly 1 token, sometimes 2
-    candidates = [s for s in OPTICS_BOKEH if s and s != "default"]
-    if not candidates:
+    if not _OPTICS_POOL:
         return None
+    return _choice(_OPTICS_POOL)
 
-    short = [s for s in candidates if s.count(",") <= 1]
-    pool = short if short else candidates
-    return random.choice(pool)
 
+# Built once so _keyword_pool can memoize on it
+_LIGHT_EFFECT_SOURCE = LIGHTING_NATURAL + LIGHTING_DRAMATIC
+_LIGHT_EFFECT_NIGHT = ("volumetric", "light shafts", "god rays", "moonlight", "starlight")
+_LIGHT_EFFECT_DAY = ("sunbeam", "sunbeams", "sun rays", "god rays", "crepuscular", "light shafts", "volumetric")
+_LIGHT_EFFECT_EXPLICIT = ("sunbeam", "volumetric", "god rays", "light shafts", "crepuscular")
+
+@functools.lru_cache(maxsize=2)
+def _light_effect_candidates(night: bool) -> Tuple[Tuple[str, str, bool], ...]:
+    """(tag, lowered tag, is explicit effect) per candidate; the source lists are fixed after load."""
+    cand = _keyword_pool(_LIGHT_EFFECT_SOURCE, _LIGHT_EFFECT_NIGHT if night else _LIGHT_EFFECT_DAY)
+    out = []
+    for c in cand:
+        cl = c.lower()
+        out.append((c, cl, any(w in cl for w in _LIGHT_EFFECT_EXPLICIT)))
+    return tuple(out)
 
 def _pick_light_effect(time_key: str, is_outdoor: bool, is_ecchi: bool, existing_text: str = "") -> Optional[str]:
     """Occasional sunbeam/volumetric accent (0-1 extra tag)."""
@@ -681,72 +787,84 @@ def _pick_light_effect(time_key: str, is_outdoor: bool, is_ecchi: bool, existing
         base -= 0.05
     base = max(0.04, base)
 
-    if random.random() > base:
+    if _urand() > base:
         return None
 
-    k = (time_key or "").lower()
-    if k in ("night", "midnight"):
-        include = ["volumetric", "light shafts", "god rays", "moonlight", "starlight"]
-    else:
-        include = ["sunbeam", "sunbeams", "sun rays", "god rays", "crepuscular", "light shafts", "volumetric"]
-
     # Pull from lighting lists that already exist (we expanded them in data)
-    pool = (LIGHTING_NATURAL or []) + (LIGHTING_DRAMATIC or [])
-    cand = _filter_by_keywords(pool, include=include)
+    cand = _light_effect_candidates((time_key or "").lower() in ("night", "midnight"))
     if not cand:
         return None
 
     ex = (existing_text or "").lower()
-    # Avoid repeats
-    cand2 = [c for c in cand if c.lower() not in ex]
+    # Avoid repeats (substring match, so "sunbeams" also blocks "sunbeam")
+    cand2 = [e for e in cand if e[1] not in ex]
     if not cand2:
         return None
 
     # Prefer explicit effects
-    explicit = [c for c in cand2 if any(w in c.lower() for w in ["sunbeam", "volumetric", "god rays", "light shafts", "crepuscular"])]
-    return random.choice(explicit if explicit else cand2)
-
+    explicit = [e[0] for e in cand2 if e[2]]
+    return _choice(explicit if explicit else [e[0] for e in cand2])
+
+
+_WEATHER_TIME_HINTS = {
+    "night": ("night", "fog", "mist", "clear night", "star", "moon", "cloud"),
+    "midnight": ("night", "fog", "mist", "clear night", "star", "moon", "cloud"),
+    "dusk": ("sunset", "twilight", "clearing", "partly cloudy", "cloud"),
+    "golden_hour": ("sunset", "twilight", "clearing", "partly cloudy", "cloud"),
+    "dawn": ("morning", "mist", "fog", "clear", "pale", "sunny"),
+    "morning": ("morning", "mist", "fog", "clear", "pale", "sunny"),
+    "noon": ("sunny", "clear", "harsh", "heat", "blue"),
+}
+_WEATHER_TIME_DEFAULT = ("partly", "cloud", "clear", "breeze")
+_WEATHER_LOC_HINTS = {
+    "cyberpunk": ("rain", "drizzle", "wet", "fog", "mist", "storm"),
+    "urban_night": ("rain", "drizzle", "wet", "fog", "mist", "storm"),
+    "nature": ("breeze", "clear", "cloud", "mist", "rain"),
+    "fantasy": ("mist", "fog", "storm", "clearing", "rainbow"),
+}
 
-def _coherent_weather(weather_list: List[str], time_key: str, location_type: str, is_ecchi: bool, is_outdoor: bool) -> Optional[str]:
+def _coherent_weather(weather_list: Sequence[str], time_key: str, location_type: str, is_ecchi: bool, is_outdoor: bool) -> Optional[str]:
     if not weather_list:
         return None
 
     # ecchi indoor scenes should rarely force weather unless spiking
     base_prob = _weather_probability(is_ecchi, location_type, is_outdoor)
     if not _should_pair():
-        return random.choice(weather_list) if random.random() < base_prob else None
+        return _choice(weather_list) if _urand() < base_prob else None
 
-    if random.random() > base_prob:
+    if _urand() > base_prob:
         return None
 
-    hints = []
-    if time_key in ("night", "midnight"):
-        hints += ["night", "fog", "mist", "clear night", "star", "moon", "cloud"]
-    elif time_key in ("dusk", "golden_hour"):
-        hints += ["sunset", "twilight", "clearing", "partly cloudy", "cloud"]
-    elif time_key in ("dawn", "morning"):
-        hints += ["morning", "mist", "fog", "clear", "pale", "sunny"]
-    elif time_key == "noon":
-        hints += ["sunny", "clear", "harsh", "heat", "blue"]
-    else:
-        hints += ["partly", "cloud", "clear", "breeze"]
-
-    # Location nudges
-    if location_type in ("cyberpunk", "urban_night"):
-        hints += ["rain", "drizzle", "wet", "fog", "mist", "storm"]
-    if location_type == "nature":
-        hints += ["breeze", "clear", "cloud", "mist", "rain"]
-    if location_type == "fantasy":
-        hints += ["mist", "fog", "storm", "clearing", "rainbow"]
+    hints = _WEATHER_TIME_HINTS.get(time_key, _WEATHER_TIME_DEFAULT) + _WEATHER_LOC_HINTS.get(location_type, ())
 
-    cand = _filter_by_keywords(weather_list, include=hints)
+    cand = _keyword_pool(weather_list, hints)
     if cand:
-        return random.choice(cand)
+        return _choice(cand)
 
-    return random.choice(weather_list)
+    return _choice(weather_list)
 
 # Track last scene time key so other modules can align (e.g., mood/atmosphere)
-def _coherent_atmosphere(atmo_list: List[str], time_key: str, location_type: str, is_ecchi: bool) -> Optional[str]:
+_ATMO_TIME_HINTS = {
+    "night": ("night", "late night", "moon", "neon", "city lights", "quiet", "noir", "fog", "mist"),
+    "midnight": ("night", "late night", "moon", "neon", "city lights", "quiet", "noir", "fog", "mist"),
+    "dusk": ("sunset", "golden", "twilight", "evening", "warm", "long shadows", "nostalgia"),
+    "golden_hour": ("sunset", "golden", "twilight", "evening", "warm", "long shadows", "nostalgia"),
+    "dawn": ("morning", "spring morning", "early", "fresh", "soft", "calm"),
+    "morning": ("morning", "spring morning", "early", "fresh", "soft", "calm"),
+    "noon": ("midday", "noon", "bright", "summer", "heat"),
+}
+_ATMO_TIME_DEFAULT = ("afternoon", "daytime", "warm", "breeze")
+_ATMO_LOC_HINTS = {
+    "cyberpunk": ("neon", "rain", "wet", "city pop", "noir", "alley"),
+    "urban_night": ("neon", "rain", "wet", "city pop", "noir", "alley"),
+    "cozy": ("cozy", "quiet room", "soft", "intimate", "bedroom"),
+    "ecchi": ("cozy", "quiet room", "soft", "intimate", "bedroom"),
+    "nature": ("breeze", "forest", "sunlight", "mist", "fresh"),
+    "school": ("after school", "classroom", "rooftop"),
+    "fantasy": ("mystic", "mist", "enchanted", "dreamy"),
+}
+
+def _coherent_atmosphere(atmo_list: Sequence[str], time_key: str, location_type: str, is_ecchi: bool) -> Optional[str]:
     """
     Pick atmosphere/mood-ish tags in a time-aware way.
     Works with your large wildcard lists (ATMOSPHERIC_EFFECTS / ATMOSPHERIC_ECCHI).
@@ -754,51 +872,38 @@ def _coherent_atmosphere(atmo_list: List[str], time_key: str, location_type: str
     if not atmo_list:
         return None
     if not _should_pair():
-        return random.choice(atmo_list)
-
-    hints = []
-    # time hints
-    if time_key in ("night", "midnight"):
-        hints += ["night", "late night", "moon", "neon", "city lights", "quiet", "noir", "fog", "mist"]
-    elif time_key in ("dusk", "golden_hour"):
-        hints += ["sunset", "golden", "twilight", "evening", "warm", "long shadows", "nostalgia"]
-    elif time_key in ("dawn", "morning"):
-        hints += ["morning", "spring morning", "early", "fresh", "soft", "calm"]
-    elif time_key == "noon":
-        hints += ["midday", "noon", "bright", "summer", "heat"]
-    else:
-        hints += ["afternoon", "daytime", "warm", "breeze"]
-
-    # location hints
-    if location_type in ("cyberpunk", "urban_night"):
-        hints += ["neon", "rain", "wet", "city pop", "noir", "alley"]
-    if location_type in ("cozy", "ecchi"):
-        hints += ["cozy", "quiet room", "soft", "intimate", "bedroom"]
-    if location_type == "nature":
-        hints += ["breeze", "forest", "sunlight", "mist", "fresh"]
-    if location_type == "school":
-        hints += ["after school", "classroom", "rooftop"]
-    if location_type == "fantasy":
-        hints += ["mystic", "mist", "enchanted", "dreamy"]
-
-    cand = _filter_by_keywords(atmo_list, include=hints)
+        return _choice(atmo_list)
+
+    # time hints, then location hints
+    hints = _ATMO_TIME_HINTS.get(time_key, _ATMO_TIME_DEFAULT) + _ATMO_LOC_HINTS.get(location_type, ())
+
+    cand = _keyword_pool(atmo_list, hints)
     if cand:
-        return random.choice(cand)
+        return _choice(cand)
+
+    return _choice(atmo_list)
+
+# Checked in this order: a tag naming two seasons keeps the earlier one here,
+# not whichever keyword happens to come first in the text
+_SEASON_RULES = tuple(
+    (season, re.compile("|".join(map(re.escape, kws))))
+    for season, kws in (
+        ("winter", ("snow", "blizzard", "sleet", "freezing", "ice", "frost", "cold snap")),
+        ("summer", ("heat wave", "desert heat", "heat shimmer", "humid", "monsoon", "summer")),
+        ("autumn", ("autumn", "fall", "leaf", "harvest")),
+        ("spring", ("spring", "pollen", "cherry blossom")),
+    )
+)
 
-    return random.choice(atmo_list)
+@functools.lru_cache(maxsize=1024)
 def _pick_season_from_weather(weather_tag: Optional[str]) -> str:
     """Heuristic season inference; safe defaults."""
     if not weather_tag:
         return ""
     w = weather_tag.lower()
-    if any(k in w for k in ["snow", "blizzard", "sleet", "freezing", "ice", "frost", "cold snap"]):
-        return "winter"
-    if any(k in w for k in ["heat wave", "desert heat", "heat shimmer", "humid", "monsoon", "summer"]):
-        return "summer"
-    if any(k in w for k in ["autumn", "fall", "leaf", "harvest"]):
-        return "autumn"
-    if any(k in w for k in ["spring", "pollen", "cherry blossom"]):
-        return "spring"
+    for season, rx in _SEASON_RULES:
+        if rx.search(w):
+            return season
     # Rain/mist are ambiguous; leave blank
     return ""
 
@@ -813,6 +918,8 @@ SUBJECTS_WEIGHTED = [
     ("2girls", 20),
     ("2girls, yuri", 10),
 ]
+# One indexed read per character instead of a weighted scan
+_SUBJECTS_SLOTS = _weight_slots(SUBJECTS_WEIGHTED)
 
 # ============================================================
 # CLOTHING AND LOCATION DICTIONARIES
@@ -859,6 +966,10 @@ ALL_LOCATIONS = {
     "ecchi": LOCATIONS_ECCHI,
 }
 
+# Catch-all pools shared by the "random" style presets below
+_ALL_LOCATION_KEYS = tuple(ALL_LOCATIONS)
+_ALL_CLOTHING_KEYS = tuple(ALL_CLOTHING)
+
 # ============================================================
 # GENRE PRESETS
 # ============================================================
@@ -1024,7 +1135,7 @@ GENRE_WEIGHTS = {
             "underwear_scifi", "underwear_fantasy", "underwear_themed",
             "underwear_sheer", "underwear_vintage"
         ],
-        "locations": list(ALL_LOCATIONS.keys()),
+        "locations": _ALL_LOCATION_KEYS,
         "poses": POSES_ECCHI,
         "lighting": LIGHTING_ECCHI + LIGHTING_NATURAL + LIGHTING_ARTIFICIAL + LIGHTING_DRAMATIC,
         "is_ecchi": True,
@@ -1039,97 +1150,110 @@ GENRE_WEIGHTS = {
         "mood": "intimate",
     },
     "random": {
-        "clothing_types": list(ALL_CLOTHING.keys()),
-        "locations": list(ALL_LOCATIONS.keys()),
+        "clothing_types": _ALL_CLOTHING_KEYS,
+        "locations": _ALL_LOCATION_KEYS,
         "poses": ALL_POSES,
         "lighting": LIGHTING_NATURAL + LIGHTING_ARTIFICIAL + LIGHTING_DRAMATIC,
         "mood": "varied",
     },
 }
 
+def _freeze_genre_pools() -> None:
+    """Store preset pools as tuples; genres that build the same pool share one copy."""
+    shared: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+    for preset in GENRE_WEIGHTS.values():
+        for key in ("clothing_types", "locations", "poses", "lighting"):
+            pool = tuple(preset[key])
+            preset[key] = shared.setdefault(pool, pool)
+
+_freeze_genre_pools()
+
 # ============================================================
 # HELPER FUNCTIONS
 # ============================================================
 
 def weighted_choice(items_with_weights: List[Tuple[str, int]]) -> str:
     """Select item based on weights"""
-    total = sum(weight for _, weight in items_with_weights)
-    r = random.randint(1, total)
-    running = 0
-    for item, weight in items_with_weights:
-        running += weight
-        if r <= running:
-            return item
-    return items_with_weights[-1][0]
+    cum = list(itertools.accumulate(weight for _, weight in items_with_weights))
+    # First running total >= r, same pick as a linear walk
+    r = random.randint(1, cum[-1])
+    return items_with_weights[bisect.bisect_left(cum, r)][0]
+
+# Runs of spaces (for clean_prompt)
+_MULTI_SPACE = re.compile(r" {2,}")
 
 def clean_prompt(prompt: str) -> str:
     """Clean up prompt formatting and remove duplicates"""
-    # Split into parts
-    parts = [part.strip() for part in prompt.split(",") if part.strip()]
-    
-    # Remove exact duplicates while preserving order
-    seen = set()
-    unique_parts = []
-    for part in parts:
-        part_lower = part.lower()
-        if part_lower not in seen:
-            seen.add(part_lower)
-            unique_parts.append(part)
+    return _clean_fragments((prompt,))
+
+def _clean_fragments(fragments: Sequence[str]) -> str:
+    """clean_prompt(", ".join(fragments)) without building the joined string first."""
+    # Split into parts and drop exact duplicates as they arrive, preserving
+    # order (first spelling wins). Pool tags are already interned by load_list;
+    # the lowered keys are fresh strings, and interning them would just add a
+    # second dict lookup per tag
+    unique: Dict[str, str] = {}
+    for fragment in fragments:
+        for part in fragment.split(","):
+            part = part.strip()
+            if part:
+                unique.setdefault(part.lower(), part)
     
     # Rejoin
-    prompt = ", ".join(unique_parts)
+    prompt = ", ".join(unique.values())
     
     # Remove double spaces
-    while "  " in prompt:
-        prompt = prompt.replace("  ", " ")
-    
-    return prompt
+    return _MULTI_SPACE.sub(" ", prompt)
+
+# Expression pool per genre mood (ecchi genres always use EXPRESSIONS_ECCHI)
+_MOOD_EXPR: Dict[str, Tuple[str, ...]] = {
+    "peaceful": EXPRESSIONS_PEACEFUL,
+    "urban": EXPRESSIONS_CONFIDENT + EXPRESSIONS_OTHER,
+    "dark": EXPRESSIONS_SERIOUS + EXPRESSIONS_MYSTERIOUS,
+    "futuristic": EXPRESSIONS_SERIOUS + EXPRESSIONS_CONFIDENT,
+    "epic": EXPRESSIONS_SERIOUS + EXPRESSIONS_CONFIDENT,
+    "medieval": EXPRESSIONS_PEACEFUL + EXPRESSIONS_SERIOUS,
+    "noir": EXPRESSIONS_MYSTERIOUS + EXPRESSIONS_SERIOUS,
+    "intense": EXPRESSIONS_SERIOUS + EXPRESSIONS_ANGRY,
+    "intimate": EXPRESSIONS_SHY,
+    "cute": EXPRESSIONS_HAPPY + EXPRESSIONS_SHY,
+    "sporty": EXPRESSIONS_HAPPY + EXPRESSIONS_CONFIDENT,
+    "luxurious": EXPRESSIONS_CONFIDENT + EXPRESSIONS_MYSTERIOUS,
+    "mystical": EXPRESSIONS_PEACEFUL + EXPRESSIONS_MYSTERIOUS,
+    "playful": EXPRESSIONS_HAPPY + EXPRESSIONS_SHY,
+    "natural": EXPRESSIONS_PEACEFUL + EXPRESSIONS_HAPPY,
+    "nostalgic": EXPRESSIONS_SAD + EXPRESSIONS_PEACEFUL,
+    "revealing": EXPRESSIONS_SHY + EXPRESSIONS_CONFIDENT,
+    "varied": EXPRESSIONS_DETAILED,
+}
 
 def get_coherent_expression(mood: str, is_ecchi: bool = False) -> str:
     """Get expression that matches the mood"""
-    mood_expressions = {
-        "peaceful": EXPRESSIONS_PEACEFUL,
-        "urban": EXPRESSIONS_CONFIDENT + EXPRESSIONS_OTHER,
-        "dark": EXPRESSIONS_SERIOUS + EXPRESSIONS_MYSTERIOUS,
-        "futuristic": EXPRESSIONS_SERIOUS + EXPRESSIONS_CONFIDENT,
-        "epic": EXPRESSIONS_SERIOUS + EXPRESSIONS_CONFIDENT,
-        "medieval": EXPRESSIONS_PEACEFUL + EXPRESSIONS_SERIOUS,
-        "noir": EXPRESSIONS_MYSTERIOUS + EXPRESSIONS_SERIOUS,
-        "intense": EXPRESSIONS_SERIOUS + EXPRESSIONS_ANGRY,
-        "intimate": EXPRESSIONS_ECCHI if is_ecchi else EXPRESSIONS_SHY,
-        "cute": EXPRESSIONS_HAPPY + EXPRESSIONS_SHY,
-        "sporty": EXPRESSIONS_HAPPY + EXPRESSIONS_CONFIDENT,
-        "luxurious": EXPRESSIONS_CONFIDENT + EXPRESSIONS_MYSTERIOUS,
-        "mystical": EXPRESSIONS_PEACEFUL + EXPRESSIONS_MYSTERIOUS,
-        "playful": EXPRESSIONS_HAPPY + EXPRESSIONS_SHY,
-        "natural": EXPRESSIONS_PEACEFUL + EXPRESSIONS_HAPPY,
-        "nostalgic": EXPRESSIONS_SAD + EXPRESSIONS_PEACEFUL,
-        "revealing": EXPRESSIONS_SHY + EXPRESSIONS_CONFIDENT,
-        "varied": EXPRESSIONS_DETAILED,
-    }
-    
     if is_ecchi:
-        return random.choice(EXPRESSIONS_ECCHI)
+        return _choice(EXPRESSIONS_ECCHI)
     
-    expressions = mood_expressions.get(mood, EXPRESSIONS_DETAILED)
-    return random.choice(expressions)
+    return _choice(_MOOD_EXPR.get(mood, EXPRESSIONS_DETAILED))
+
+# Era tags that imply 80s/90s/retro, so get_artistic_style may add a retro flavour tag
+_RETRO_ERAS = frozenset(
+    e for e in ERA_OPTIONS if any(k in e.lower() for k in ("80", "90", "retro", "vhs", "ova"))
+)
 
 def get_artistic_style() -> str:
     """Generate varied artistic style string from loaded files"""
-    film_grain = random.choice(FILM_GRAIN_OPTIONS) if FILM_GRAIN_OPTIONS else "film grain"
-    shading = random.choice(SHADING_OPTIONS) if SHADING_OPTIONS else "cel shading"
-    linework = random.choice(LINEWORK_OPTIONS) if LINEWORK_OPTIONS else "detailed linework"
-    shadows = random.choice(SHADOW_OPTIONS) if SHADOW_OPTIONS else "soft shadows"
-    contrast = random.choice(CONTRAST_OPTIONS) if CONTRAST_OPTIONS else "high contrast"
-    era = random.choice(ERA_OPTIONS) if ERA_OPTIONS else "modern anime style"
+    film_grain = _choice(FILM_GRAIN_OPTIONS) if FILM_GRAIN_OPTIONS else "film grain"
+    shading = _choice(SHADING_OPTIONS) if SHADING_OPTIONS else "cel shading"
+    linework = _choice(LINEWORK_OPTIONS) if LINEWORK_OPTIONS else "detailed linework"
+    shadows = _choice(SHADOW_OPTIONS) if SHADOW_OPTIONS else "soft shadows"
+    contrast = _choice(CONTRAST_OPTIONS) if CONTRAST_OPTIONS else "high contrast"
+    era = _choice(ERA_OPTIONS) if ERA_OPTIONS else "modern anime style"
 
     elements = [film_grain, shading, linework, shadows, contrast, era]
 
     # Controlled retro flavor: only when the chosen era implies 80s/90s/retro, and only add 0-1 extra tag
-    era_l = era.lower()
-    if RETRO_90S_FLAVOR and ("80" in era_l or "90" in era_l or "retro" in era_l or "vhs" in era_l or "ova" in era_l):
-        if random.random() < 0.35:
-            elements.append(random.choice(RETRO_90S_FLAVOR))
+    if RETRO_90S_FLAVOR and era in _RETRO_ERAS:
+        if _urand() < 0.35:
+            elements.append(_choice(RETRO_90S_FLAVOR))
 
     return ", ".join(elements)
 
@@ -1137,6 +1261,25 @@ def get_artistic_style() -> str:
 # MAIN GENERATION FUNCTIONS
 # ============================================================
 
+# (threshold, pool) slots filled in order by generate_character: a slot is
+# added when a coin flip beats its threshold, or always when it is None
+_CHARACTER_SLOTS: Tuple[Tuple[Optional[float], Sequence[str]], ...] = (
+    (0.3, FACE_QUALITY),
+    (0.5, BODY_TYPES),
+    (0.5, BREAST_SIZES),
+    (0.7, BODY_DETAILS),
+    (0.7, SKIN_DETAILS),
+    (0.7, MAKEUP),
+)
+_CHARACTER_SLOTS_ECCHI: Tuple[Tuple[Optional[float], Sequence[str]], ...] = (
+    (0.3, FACE_QUALITY),
+    (None, BODY_TYPES_ECCHI),
+    (None, BREAST_SIZES_ECCHI),
+    (0.3, BODY_DETAILS_ECCHI),
+    (0.5, SKIN_DETAILS_ECCHI),
+    (0.6, MAKEUP_ECCHI),
+)
+
 def generate_character(is_ecchi: bool = False, force_1girl: bool = False) -> str:
     """Generate detailed character description"""
     parts = []
@@ -1145,179 +1288,136 @@ def generate_character(is_ecchi: bool = False, force_1girl: bool = False) -> str
     if force_1girl:
         parts.append("1girl, solo")
     else:
-        parts.append(weighted_choice(SUBJECTS_WEIGHTED))
+        parts.append(_pick_slot(_SUBJECTS_SLOTS))
     
     # Age/Maturity (occasional)
     if is_ecchi:
-        if random.random() > 0.4:
-            parts.append(random.choice(AGE_MATURITY_ECCHI))
+        if _urand() > 0.4:
+            parts.append(_choice(AGE_MATURITY_ECCHI))
     else:
-        if random.random() > 0.5:
-            parts.append(random.choice(AGE_MATURITY))
+        if _urand() > 0.5:
+            parts.append(_choice(AGE_MATURITY))
     
     # Ethnicity/Skin (occasional variety)
-    if random.random() > 0.6:
-        parts.append(random.choice(NATIONALITY_ETHNICITY))
-    elif random.random() > 0.5:
-        parts.append(random.choice(SKIN_TONES))
+    if _urand() > 0.6:
+        parts.append(_choice(NATIONALITY_ETHNICITY))
+    elif _urand() > 0.5:
+        parts.append(_choice(SKIN_TONES))
     
-    # Face quality
-    if random.random() > 0.3:
-        parts.append(random.choice(FACE_QUALITY))
-    
-    # Body type
-    if is_ecchi:
-        parts.append(random.choice(BODY_TYPES_ECCHI))
-        parts.append(random.choice(BREAST_SIZES_ECCHI))
-        if random.random() > 0.3:
-            parts.append(random.choice(BODY_DETAILS_ECCHI))
-    else:
-        if random.random() > 0.5:
-            parts.append(random.choice(BODY_TYPES))
-        if random.random() > 0.5:
-            parts.append(random.choice(BREAST_SIZES))
-        if random.random() > 0.7:
-            parts.append(random.choice(BODY_DETAILS))
-    
-    # Skin details
-    if is_ecchi:
-        if random.random() > 0.5:
-            parts.append(random.choice(SKIN_DETAILS_ECCHI))
-    else:
-        if random.random() > 0.7:
-            parts.append(random.choice(SKIN_DETAILS))
-    
-    # Makeup
-    if is_ecchi:
-        if random.random() > 0.6:
-            parts.append(random.choice(MAKEUP_ECCHI))
-    else:
-        if random.random() > 0.7:
-            parts.append(random.choice(MAKEUP))
+    # Face, body, skin details, makeup
+    for threshold, pool in (_CHARACTER_SLOTS_ECCHI if is_ecchi else _CHARACTER_SLOTS):
+        if threshold is None or _urand() > threshold:
+            parts.append(_choice(pool))
     
     # Eyes
-    eye_color = random.choice(EYE_COLORS)
-    eye_quality = random.choice(EYE_QUALITY)
+    eye_color = _choice(EYE_COLORS)
+    eye_quality = _choice(EYE_QUALITY)
     parts.append(f"{eye_color}, {eye_quality}")
     
     # Hair color with optional modifier for variety
-    hair_color = random.choice(HAIR_COLORS)
-    if random.random() > 0.7:
-        hair_modifier = random.choice(HAIR_COLOR_MODIFIERS)
+    hair_color = _choice(HAIR_COLORS)
+    if _urand() > 0.7:
+        hair_modifier = _choice(HAIR_COLOR_MODIFIERS)
         parts.append(f"{hair_color}, {hair_modifier}")
     else:
         parts.append(hair_color)
     
     # Hair style
     if is_ecchi:
-        parts.append(random.choice(HAIR_STYLES_ECCHI))
+        parts.append(_choice(HAIR_STYLES_ECCHI))
     else:
-        parts.append(random.choice(HAIR_STYLES))
+        parts.append(_choice(HAIR_STYLES))
     
     # Hair accessory (occasional)
-    if random.random() > 0.7:
-        parts.append(random.choice(HAIR_ACCESSORIES))
+    if _urand() > 0.7:
+        parts.append(_choice(HAIR_ACCESSORIES))
     
     return ", ".join(parts)
 
+# Outfit already names a colour / a see-through material; scene is a bath/onsen
+# (all substring matches, like `in`)
+_OUTFIT_COLOR_RE = re.compile("white|black|red|blue|pink|purple|green|yellow|orange|grey|brown")
+_SHEER_RE = re.compile("sheer|transparent|see-through|mesh")
+_BATH_RE = re.compile("bath|bathtub|onsen|bathhouse|shower|steam")
+_BATH_OUTFITS = ECCHI_TOWEL + ECCHI_SLEEPWEAR + ECCHI_LINGERIE + ECCHI_UNDERWEAR
+_SHEER_TAGS = ("sheer", "mesh", "transparent lace", "see-through fabric")
+_LEGWEAR_COLORS_ECCHI = ("white", "black", "nude", "pink", "red")
+
+# Accessory/jewelry plan: (neither below, one of them below, accessories, jewelry); above = both
+_ACCESSORY_PLAN = (0.55, 0.93, ACCESSORIES, JEWELRY)
+_ACCESSORY_PLAN_ECCHI = (0.45, 0.90, ACCESSORIES_ECCHI, JEWELRY_ECCHI)
+
 def generate_outfit(genre: str = "random", context: str = "") -> str:
     """Generate outfit based on genre with color variations"""
     preset = GENRE_WEIGHTS.get(genre, GENRE_WEIGHTS["random"])
     is_ecchi = preset.get("is_ecchi", False)
     
-    clothing_type = random.choice(preset["clothing_types"])
+    clothing_type = _choice(preset["clothing_types"])
     clothing_list = ALL_CLOTHING.get(clothing_type, CASUAL_CLOTHING)
-    outfit = random.choice(clothing_list)
+    outfit = _choice(clothing_list)
     
 
-    ctx = (context or "").lower()
-    bath_ctx = any(k in ctx for k in ["bath", "bathtub", "onsen", "bathhouse", "shower", "steam"])
-    if is_ecchi and bath_ctx:
+    if is_ecchi and _BATH_RE.search((context or "").lower()):
         # Bias toward towels/robes/lingerie for bath/onsen contexts; avoid heavy streetwear/uniforms
-        bath_pool = ECCHI_TOWEL + ECCHI_SLEEPWEAR + ECCHI_LINGERIE + ECCHI_UNDERWEAR
-        outfit = random.choice(bath_pool) if bath_pool else outfit
+        outfit = _choice(_BATH_OUTFITS) if _BATH_OUTFITS else outfit
 
     parts = []
     
     # Add color variation sometimes
-    if random.random() > 0.6 and not any(c in outfit.lower() for c in ["white", "black", "red", "blue", "pink", "purple", "green", "yellow", "orange", "grey", "brown"]):
-        color = random.choice(CLOTHING_COLORS)
+    if _urand() > 0.6 and not _OUTFIT_COLOR_RE.search(outfit.lower()):
+        color = _choice(CLOTHING_COLORS)
         parts.append(f"{color} {outfit}")
     else:
         parts.append(outfit)
     
     # Add pattern OR material occasionally for ecchi (one slot to avoid prompt bloat)
-    if is_ecchi and random.random() > 0.7:
+    if is_ecchi and _urand() > 0.7:
         # Prefer fabric-like materials for Illustrious XL tag vocab; avoid fetish/modern plastics most of the time
-        if MATERIAL_TYPES and random.random() < 0.55:
-            safe = []
-            for m in MATERIAL_TYPES:
-                ml = (m or "").lower()
-                if not ml:
-                    continue
-                if any(bad in ml for bad in ["latex", "vinyl", "pvc"]):
-                    continue
-                safe.append(m)
-            pool = safe if safe else MATERIAL_TYPES
-            parts.append(random.choice(pool))
+        if MATERIAL_TYPES and _urand() < 0.55:
+            parts.append(_choice(SAFE_MATERIAL_TYPES))
         else:
-            parts.append(random.choice(UNDERWEAR_PATTERNS))
+            parts.append(_choice(UNDERWEAR_PATTERNS))
 
 
     # Optional 'sheer' material spice (helps visibility of the sheer option)
-    if is_ecchi and ("underwear_sheer" in clothing_type or random.random() > 0.88):
-        if not any(w in " ".join(parts).lower() for w in ["sheer", "transparent", "see-through", "mesh"]):
-            parts.append(random.choice(["sheer", "mesh", "transparent lace", "see-through fabric"]))
+    if is_ecchi and ("underwear_sheer" in clothing_type or _urand() > 0.88):
+        if not _SHEER_RE.search(" ".join(parts).lower()):
+            parts.append(_choice(_SHEER_TAGS))
     
     # Legwear with color
     if is_ecchi:
-        if random.random() > 0.5:
-            legwear = random.choice(LEGWEAR_ECCHI)
-            if random.random() > 0.6:
-                color = random.choice(["white", "black", "nude", "pink", "red"])
+        if _urand() > 0.5:
+            legwear = _choice(LEGWEAR_ECCHI)
+            if _urand() > 0.6:
+                color = _choice(_LEGWEAR_COLORS_ECCHI)
                 parts.append(f"{color} {legwear}")
             else:
                 parts.append(legwear)
     else:
-        if random.random() > 0.5:
-            parts.append(random.choice(LEGWEAR))
+        if _urand() > 0.5:
+            parts.append(_choice(LEGWEAR))
     
     # Footwear (less for ecchi)
     if is_ecchi:
-        if random.random() > 0.7:
-            parts.append(random.choice(FOOTWEAR))
+        if _urand() > 0.7:
+            parts.append(_choice(FOOTWEAR))
     else:
-        if random.random() > 0.4:
-            parts.append(random.choice(FOOTWEAR))
+        if _urand() > 0.4:
+            parts.append(_choice(FOOTWEAR))
     
     # Accessories / Jewelry (slot-based so it doesn't always add both)
     # Goal: allow neither, one, or both — with "both" rarer to reduce repetition/bloat.
-    if is_ecchi:
-        r = random.random()
-        if r < 0.45:
-            pass  # neither
-        elif r < 0.90:
-            # one of them
-            if random.random() < 0.65:
-                parts.append(random.choice(ACCESSORIES_ECCHI))
-            else:
-                parts.append(random.choice(JEWELRY_ECCHI))
-        else:
-            # both (rare)
-            parts.append(random.choice(ACCESSORIES_ECCHI))
-            parts.append(random.choice(JEWELRY_ECCHI))
+    none_below, one_below, accessories, jewelry = _ACCESSORY_PLAN_ECCHI if is_ecchi else _ACCESSORY_PLAN
+    r = _urand()
+    if r < none_below:
+        pass  # neither
+    elif r < one_below:
+        # one of them
+        parts.append(_choice(accessories if _urand() < 0.65 else jewelry))
     else:
-        r = random.random()
-        if r < 0.55:
-            pass  # neither
-        elif r < 0.93:
-            if random.random() < 0.65:
-                parts.append(random.choice(ACCESSORIES))
-            else:
-                parts.append(random.choice(JEWELRY))
-        else:
-            parts.append(random.choice(ACCESSORIES))
-            parts.append(random.choice(JEWELRY))
+        # both (rare)
+        parts.append(_choice(accessories))
+        parts.append(_choice(jewelry))
     
     return ", ".join(parts)
 
@@ -1326,16 +1426,16 @@ def generate_pose(genre: str = "random") -> str:
     preset = GENRE_WEIGHTS.get(genre, GENRE_WEIGHTS["random"])
     is_ecchi = preset.get("is_ecchi", False)
     
-    pose = random.choice(preset["poses"])
+    pose = _choice(preset["poses"])
     parts = [pose]
     
     # Hand position
     if is_ecchi:
-        if random.random() > 0.5:
-            parts.append(random.choice(HAND_POSITIONS_ECCHI))
+        if _urand() > 0.5:
+            parts.append(_choice(HAND_POSITIONS_ECCHI))
     else:
-        if random.random() > 0.6:
-            parts.append(random.choice(HAND_POSITIONS))
+        if _urand() > 0.6:
+            parts.append(_choice(HAND_POSITIONS))
     
     return ", ".join(parts)
 
@@ -1345,12 +1445,17 @@ def generate_mood() -> str:
     if not MOODS:
         return ""
     # Keep it subtle: 0-2 tags
-    r = random.random()
+    r = _urand()
     if r < 0.35:
         return ""
-    count = 1 if r < 0.85 else 2
-    picks = random.sample(MOODS, k=min(count, len(MOODS)))
-    return ", ".join(picks)
+    if r < 0.85 or len(MOODS) == 1:
+        # One tag: same draw as sample(k=1) without its pool/set setup
+        return _choice(MOODS)
+    return ", ".join(random.sample(MOODS, k=2))
+
+# Camera angles used when the angle files are empty
+_ANGLE_FALLBACK = ("from front", "from side", "three-quarter view", "profile", "straight-on")
+_ANGLE_FALLBACK_ECCHI = ("from front", "from side", "three-quarter view", "over shoulder", "looking up at viewer")
 
 def generate_scene(genre: str = "random", distance_preset: str = "random") -> str:
     """Generate scene with camera, time-of-day, location, lighting, weather, atmosphere.
@@ -1366,25 +1471,21 @@ def generate_scene(genre: str = "random", distance_preset: str = "random") -> st
 
     # Camera distance/framing (primary - comes first)
     if distance_preset != "random" and distance_preset in CAMERA_DISTANCE_DETAILED:
-        parts.append(random.choice(CAMERA_DISTANCE_DETAILED[distance_preset]))
+        parts.append(_choice(CAMERA_DISTANCE_DETAILED[distance_preset]))
     else:
-        parts.append(random.choice(FRAMING_ECCHI) if is_ecchi else random.choice(CAMERA_DISTANCE))
+        parts.append(_choice(FRAMING_ECCHI) if is_ecchi else _choice(CAMERA_DISTANCE))
 
     # Camera angle (secondary)
     # Use external camera angle pools for better variance (no prompt bloat vs previous hardcoded list)
     angle_pool = CAMERA_ANGLES_ECCHI if (is_ecchi and CAMERA_ANGLES_ECCHI) else CAMERA_ANGLES
-    if angle_pool:
-        parts.append(random.choice(angle_pool))
-    else:
-        angle_options = ["from front", "from side", "three-quarter view", "profile", "straight-on"]
-        if is_ecchi:
-            angle_options = ["from front", "from side", "three-quarter view", "over shoulder", "looking up at viewer"]
-        parts.append(random.choice(angle_options))
+    if not angle_pool:
+        angle_pool = _ANGLE_FALLBACK_ECCHI if is_ecchi else _ANGLE_FALLBACK
+    parts.append(_choice(angle_pool))
 
     # --- Time-of-day ↔ location ↔ lighting ↔ weather coherence ---
     # Decide a location bucket, then time, then pick coherent location + lighting + weather.
-    preset_locations = preset.get("locations", list(ALL_LOCATIONS.keys()))
-    location_type_raw = random.choice(preset_locations)
+    preset_locations = preset["locations"]
+    location_type_raw = _choice(preset_locations)
     time_key = _pick_time_key(is_ecchi=is_ecchi, location_type=location_type_raw)
 
     # In spiky mode, sometimes intentionally mismatch the time/location bucket
@@ -1394,13 +1495,14 @@ def generate_scene(genre: str = "random", distance_preset: str = "random") -> st
 
     # Coherent bucket selection (paired/spiky only)
     location_type = _coherent_location_type(preset_locations, time_key) if _should_pair() else location_type_raw
-    location = random.choice(ALL_LOCATIONS.get(location_type, LOCATIONS_COZY))
+    location = _choice(ALL_LOCATIONS.get(location_type, LOCATIONS_COZY))
     time_tag = _time_tag(time_key)
     parts.append(time_tag)  # time tag is explicit and useful
 
     # Optional sky detail (boosts sky variety; mainly outdoors)
-    sky_prob = 0.70 if _is_outdoor(location_type, location) else 0.18
-    if random.random() < sky_prob:
+    is_outdoor = _is_outdoor(location_type, location)
+    sky_prob = 0.70 if is_outdoor else 0.18
+    if _urand() < sky_prob:
         sky = _coherent_sky(SKY_DETAILS, time_key, location_type)
         if sky:
             parts.append(sky)
@@ -1419,13 +1521,11 @@ def generate_scene(genre: str = "random", distance_preset: str = "random") -> st
         parts.append(optics)
 
     # Occasional sunbeam/volumetric accent (kept compact)
-    effect = _pick_light_effect(time_key, is_outdoor=_is_outdoor(location_type, location), is_ecchi=is_ecchi, existing_text=", ".join(parts))
+    effect = _pick_light_effect(time_key, is_outdoor=is_outdoor, is_ecchi=is_ecchi, existing_text=", ".join(parts))
     if effect:
         parts.append(effect)
 
     # Weather (rare for ecchi indoor unless lucky/spiky)
-    is_outdoor = _is_outdoor(location_type, location)
-
     weather = _coherent_weather(WEATHER, time_key, location_type, is_ecchi, is_outdoor)
     if weather:
         parts.append(weather)
@@ -1435,54 +1535,63 @@ def generate_scene(genre: str = "random", distance_preset: str = "random") -> st
     # Atmospheric effects (time-aware in paired/spiky mode)
     # In spiky mode, we allow occasional contradiction by sampling from the full list unfiltered.
     atmo_list = ATMOSPHERIC_ECCHI if is_ecchi else ATMOSPHERIC_EFFECTS
-    if atmo_list and (random.random() > (0.55 if is_ecchi else 0.70)):
+    if atmo_list and (_urand() > (0.55 if is_ecchi else 0.70)):
         if _try_spike():
-            parts.append(random.choice(atmo_list))
+            parts.append(_choice(atmo_list))
         else:
             chosen_atmo = _coherent_atmosphere(atmo_list, time_key, location_type, is_ecchi)
             if chosen_atmo:
                 parts.append(chosen_atmo)
 
     return ", ".join(parts)
+# Scene words that make generate_style lean toward dramatic enhancers
+_DRAMATIC_RE = re.compile(
+    "night|midnight|twilight|dusk|storm|thunder|rainy|neon|noir|spotlight|moonlight|dark|dramatic"
+)
+
 def generate_style(is_ecchi: bool = False, context: str = "") -> str:
     """Generate style elements"""
     parts = []
 
     # Illustrious enhancer (standard/ecchi) with dramatic variants when scene hints call for it
-    if random.random() > 0.4:
+    if _urand() > 0.4:
         if is_ecchi:
-            parts.append(random.choice(STYLE_ENHANCERS_ECCHI))
+            parts.append(_choice(STYLE_ENHANCERS_ECCHI))
         else:
-            ctx = (context or "").lower()
-            dramatic_hint = any(k in ctx for k in [
-                "night", "midnight", "twilight", "dusk", "storm", "thunder", "rainy",
-                "neon", "noir", "spotlight", "moonlight", "dark", "dramatic"
-            ])
+            dramatic_hint = _DRAMATIC_RE.search((context or "").lower()) is not None
             if STYLE_ENHANCERS_DRAMATIC:
                 # Prefer dramatic enhancers when the scene is already dramatic; otherwise keep it rare
-                use_dramatic = (dramatic_hint and random.random() < 0.65) or (not dramatic_hint and random.random() < 0.12)
+                use_dramatic = (dramatic_hint and _urand() < 0.65) or (not dramatic_hint and _urand() < 0.12)
                 pool = STYLE_ENHANCERS_DRAMATIC if use_dramatic else STYLE_ENHANCERS_STANDARD
             else:
                 pool = STYLE_ENHANCERS_STANDARD
-            parts.append(random.choice(pool))
+            parts.append(_choice(pool))
     
     # Style modifier
-    if random.random() > 0.4:
-        parts.append(random.choice(STYLE_MODIFIERS))
+    if _urand() > 0.4:
+        parts.append(_choice(STYLE_MODIFIERS))
     
     # Artistic style
-    if random.random() > 0.3:
-        parts.append(random.choice(ARTISTIC_STYLES))
+    if _urand() > 0.3:
+        parts.append(_choice(ARTISTIC_STYLES))
     
     # Rendering style
-    if random.random() > 0.5:
-        parts.append(random.choice(RENDERING_STYLES))
+    if _urand() > 0.5:
+        parts.append(_choice(RENDERING_STYLES))
     
     # Dynamic artistic style
     parts.append(get_artistic_style())
     
     return ", ".join(parts)
 
+# Concrete presets that "ecchi_random" resolves to (one per prompt)
+_ECCHI_RANDOM_GENRES = (
+    "ecchi_standard", "ecchi_scifi", "ecchi_fantasy",
+    "ecchi_cute", "ecchi_athletic", "ecchi_elegant",
+    "ecchi_sheer", "ecchi_vintage", "ecchi_themed",
+    "ecchi_nature", "ecchi_torn",
+)
+
 def generate_prompt(
     genre: str = "random",
     seed: Optional[int] = None,
@@ -1508,6 +1617,8 @@ def generate_prompt(
     11. Atmosphere
     12. Artistic style
     """
+    # Always reseed, even for a repeated seed: the global state has moved on,
+    # and callers (the plus wrapper's extra pools) keep drawing from it after us
     if seed is not None:
         random.seed(seed)
     _reset_spike_budget()
@@ -1515,13 +1626,7 @@ def generate_prompt(
     # Handle ecchi_random
     actual_genre = genre
     if genre == "ecchi_random":
-        ecchi_genres = [
-            "ecchi_standard", "ecchi_scifi", "ecchi_fantasy",
-            "ecchi_cute", "ecchi_athletic", "ecchi_elegant",
-            "ecchi_sheer", "ecchi_vintage", "ecchi_themed",
-            "ecchi_nature", "ecchi_torn",
-        ]
-        actual_genre = random.choice(ecchi_genres)
+        actual_genre = _choice(_ECCHI_RANDOM_GENRES)
     
     preset = GENRE_WEIGHTS.get(actual_genre, GENRE_WEIGHTS["random"])
     is_ecchi = preset.get("is_ecchi", False)
@@ -1536,16 +1641,16 @@ def generate_prompt(
 
     # Add random quality booster (reduced if scaffold already contains many quality tokens)
     booster_prob = 0.55
-    if _has_real_list(QUALITY_SCAFFOLD_ILLUSTRIOUS) and ("amazing quality" in quality.lower() or "extremely aesthetic" in quality.lower() or "very aesthetic" in quality.lower()):
+    if _HAS_QUALITY_SCAFFOLD and ("amazing quality" in quality.lower() or "extremely aesthetic" in quality.lower() or "very aesthetic" in quality.lower()):
         booster_prob = 0.30
-    if random.random() < booster_prob:
-        prompt_parts.append(random.choice(QUALITY_BOOSTERS))
+    if _urand() < booster_prob:
+        prompt_parts.append(_choice(QUALITY_BOOSTERS))
     
     # 2. Style enhancer at start
     if is_ecchi:
-        prompt_parts.append(random.choice(STYLE_ENHANCERS_ECCHI))
+        prompt_parts.append(_choice(STYLE_ENHANCERS_ECCHI))
     else:
-        prompt_parts.append(random.choice(STYLE_ENHANCERS_STANDARD))
+        prompt_parts.append(_choice(STYLE_ENHANCERS_STANDARD))
     
     # 3-4. Character (includes subject count and all physical details)
     prompt_parts.append(generate_character(is_ecchi, force_1girl))
@@ -1586,86 +1691,209 @@ def generate_prompt(
     if extra_words and extra_words.strip():
         prompt_parts.append(extra_words.strip())
     
-    # Combine and clean
-    prompt = ", ".join(prompt_parts)
-    return clean_prompt(prompt)
+    # Combine and clean (split per fragment; only the cleaned tags are joined)
+    return _clean_fragments(prompt_parts)
+
+def generate_prompts(
+    count: int,
+    genre: str = "random",
+    seed: Optional[int] = None,
+    extra_words: str = "",
+    distance_preset: str = "random",
+    force_1girl: bool = False,
+    quality_preset: str = "ultra",
+    progress=None,
+) -> List[str]:
+    """Generate `count` prompts; prompt i uses seed + i when a seed is given.
+
+    Output matches calling generate_prompt() in a loop, so seeded batches stay
+    reproducible; that is also why randomness is drawn per prompt rather than
+    pre-drawn for the whole batch. `progress(i)` is called after each prompt
+    if given.
+    """
+    gen = generate_prompt
+    out: List[str] = []
+    append = out.append
+    for i in range(count):
+        append(gen(
+            genre=genre,
+            seed=seed + i if seed is not None else None,
+            extra_words=extra_words,
+            distance_preset=distance_preset,
+            force_1girl=force_1girl,
+            quality_preset=quality_preset,
+        ))
+        if progress is not None:
+            progress(i + 1)
+    return out
+
+# Below this many prompts a process pool costs more to start (workers reload
+# the data files on spawn) than it saves; ~0.3 s of serial work
+_PARALLEL_MIN_COUNT = 5000
+
+def _generate_for_seed(seed: Optional[int], options: Dict) -> str:
+    return generate_prompt(seed=seed, **options)
+
+def _generate_prompts_parallel(count: int, seed: Optional[int], options: Dict, progress=None) -> List[str]:
+    """generate_prompts() across worker processes; prompt i still uses seed + i.
+
+    Results come back in order, so seeded output matches the serial path.
+    """
+    # Imported here: it pulls in multiprocessing, which only this path needs
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = os.cpu_count() or 1
+    seeds = [seed + i if seed is not None else None for i in range(count)]
+    out: List[str] = []
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        results = ex.map(
+            functools.partial(_generate_for_seed, options=options),
+            seeds,
+            chunksize=max(1, count // (workers * 4)),
+        )
+        for prompt in results:
+            out.append(prompt)
+            if progress is not None:
+                progress(len(out))
+    return out
 
 # ============================================================
 # INTERACTIVE MODE
 # ============================================================
 
+# Banner and genre menu shown by interactive_mode()
+_GENRE_MENU = (
+    "╔══════════════════════════════════════════════════════════════╗\n"
+    "║     ANIME PROMPT GENERATOR v6.4 (Illustrious SDXL 2.0)      ║\n"
+    "║          External Data Files Edition - Easy to Expand!      ║\n"
+    "╚══════════════════════════════════════════════════════════════╝\n"
+    "\n"
+    "🎨 SELECT GENRE:\n"
+    "\n"
+    "  ─── STANDARD GENRES ───\n"
+    "  1)  Cozy Slice of Life  - Peaceful cafes, bedrooms, warm lighting\n"
+    "  2)  Urban Contemporary  - Modern streets, rooftops, city vibes\n"
+    "  3)  Cyberpunk Noir      - Neon streets, tech wear, rain-slicked\n"
+    "  4)  Sci-Fi Future       - Space suits, androids, futuristic\n"
+    "  5)  Fantasy Adventure   - Castles, magic, medieval settings\n"
+    "  6)  Medieval Fantasy    - Taverns, corsets, knights, princesses\n"
+    "  7)  Neo Noir            - Detective aesthetic, dramatic shadows\n"
+    "  8)  Nature Scenic       - Beaches, forests, mountains, outdoors\n"
+    "  9)  Action Torn         - Battle damaged, ripped clothes\n"
+    "\n"
+    "  ─── ECCHI GENRES (Themed underwear + matching environments) ───\n"
+    "  10) Ecchi Standard      - Swimwear, lingerie, bedroom settings\n"
+    "  11) Ecchi Sci-Fi        - Holographic/neon/chrome underwear, cyber settings\n"
+    "  12) Ecchi Fantasy       - Chainmail/elven/dragon lingerie, castle settings\n"
+    "  13) Ecchi Cute          - Kawaii/frilly/ribbon underwear, cozy settings\n"
+    "  14) Ecchi Athletic      - Sports bras, gym shorts, locker room settings\n"
+    "  15) Ecchi Elegant       - Silk/satin/luxury lingerie, upscale settings\n"
+    "  16) Ecchi Sheer         - See-through/transparent underwear, intimate\n"
+    "  17) Ecchi Vintage       - Retro/pinup underwear, historical settings\n"
+    "  18) Ecchi Themed        - Costume underwear (maid, nurse, etc)\n"
+    "  19) Ecchi Nature        - Casual underwear, outdoor settings\n"
+    "  20) Ecchi Torn          - Battle damaged, revealing tears\n"
+    "  21) Ecchi Random        - Random from ALL ecchi presets above!\n"
+    "\n"
+    "  ─── UNDERWEAR ONLY ───\n"
+    "  22) Underwear Only      - All underwear types, intimate settings\n"
+    "\n"
+    "  23) Random (All)        - Mix of everything (surprise me!)\n"
+    "\n"
+)
+
+# Quality preset menu
+_QUALITY_MENU = (
+    "✨ QUALITY PRESET:\n"
+    "   1) Ultra (default)   - Maximum quality tags\n"
+    "   2) High              - Standard high quality\n"
+    "   3) Standard          - Basic quality\n"
+    "   4) Artistic          - Focus on artistic style\n"
+    "\n"
+)
+
+# Camera distance menu
+_DISTANCE_MENU = (
+    "📷 CAMERA DISTANCE / FRAMING:\n"
+    "   1) Face Close-up    - Extreme close-up, face only\n"
+    "   2) Portrait         - Head and shoulders, upper body\n"
+    "   3) Half Body        - Cowboy shot, waist up\n"
+    "   4) Full Body        - Whole body visible\n"
+    "   5) Wide Scene       - Full body with environment\n"
+    "   6) Random (default) - Mix of all distances\n"
+    "\n"
+)
+
+# Character count prompt
+_CHARACTER_MENU = (
+    "👤 CHARACTER COUNT:\n"
+    "   Force single character (1girl, solo) for all prompts?\n"
+    "   Y = Always use '1girl, solo' (no 2girls)\n"
+    "   N = Allow random character count (mostly 1girl, sometimes 2girls)\n"
+    "\n"
+)
+
+# Extra words prompt
+_EXTRA_WORDS_MENU = (
+    "📝 EXTRA WORDS (optional):\n"
+    "   Add custom tags/words to append to EVERY prompt in batch.\n"
+    "   Examples: 'rain, umbrella' or 'holding flowers' or 'looking at viewer'\n"
+    "\n"
+)
+
+# Whole-number answers (prompt count, seed)
+_INT_RE = re.compile(r"[+-]?\d+")
+
+# Menu answers -> genre / quality preset / camera distance preset
+_GENRE_MAP = {
+    "1": "cozy_slice_of_life",
+    "2": "urban_contemporary",
+    "3": "cyberpunk_noir",
+    "4": "scifi_future",
+    "5": "fantasy_adventure",
+    "6": "medieval_fantasy",
+    "7": "neo_noir",
+    "8": "nature_scenic",
+    "9": "action_torn",
+    "10": "ecchi_standard",
+    "11": "ecchi_scifi",
+    "12": "ecchi_fantasy",
+    "13": "ecchi_cute",
+    "14": "ecchi_athletic",
+    "15": "ecchi_elegant",
+    "16": "ecchi_sheer",
+    "17": "ecchi_vintage",
+    "18": "ecchi_themed",
+    "19": "ecchi_nature",
+    "20": "ecchi_torn",
+    "21": "ecchi_random",
+    "22": "underwear_only",
+    "23": "random"
+}
+
+_QUALITY_MAP = {
+    "1": "ultra", "2": "high", "3": "standard", "4": "artistic", "": "ultra"
+}
+
+_DISTANCE_MAP = {
+    "1": "face_closeup",
+    "2": "portrait",
+    "3": "half_body",
+    "4": "full_body",
+    "5": "wide_scene",
+    "6": "random",
+    "": "random"
+}
+
 def interactive_mode():
     """Run the generator in interactive mode"""
-    print("╔" + "═" * 62 + "╗")
-    print("║" + " " * 5 + "ANIME PROMPT GENERATOR v6.4 (Illustrious SDXL 2.0)" + " " * 6 + "║")
-    print("║" + " " * 10 + "External Data Files Edition - Easy to Expand!" + " " * 6 + "║")
-    print("╚" + "═" * 62 + "╝")
-    print()
-    
-    # Genre selection
-    print("🎨 SELECT GENRE:")
-    print()
-    print("  ─── STANDARD GENRES ───")
-    print("  1)  Cozy Slice of Life  - Peaceful cafes, bedrooms, warm lighting")
-    print("  2)  Urban Contemporary  - Modern streets, rooftops, city vibes")
-    print("  3)  Cyberpunk Noir      - Neon streets, tech wear, rain-slicked")
-    print("  4)  Sci-Fi Future       - Space suits, androids, futuristic")
-    print("  5)  Fantasy Adventure   - Castles, magic, medieval settings")
-    print("  6)  Medieval Fantasy    - Taverns, corsets, knights, princesses")
-    print("  7)  Neo Noir            - Detective aesthetic, dramatic shadows")
-    print("  8)  Nature Scenic       - Beaches, forests, mountains, outdoors")
-    print("  9)  Action Torn         - Battle damaged, ripped clothes")
-    print()
-    print("  ─── ECCHI GENRES (Themed underwear + matching environments) ───")
-    print("  10) Ecchi Standard      - Swimwear, lingerie, bedroom settings")
-    print("  11) Ecchi Sci-Fi        - Holographic/neon/chrome underwear, cyber settings")
-    print("  12) Ecchi Fantasy       - Chainmail/elven/dragon lingerie, castle settings")
-    print("  13) Ecchi Cute          - Kawaii/frilly/ribbon underwear, cozy settings")
-    print("  14) Ecchi Athletic      - Sports bras, gym shorts, locker room settings")
-    print("  15) Ecchi Elegant       - Silk/satin/luxury lingerie, upscale settings")
-    print("  16) Ecchi Sheer         - See-through/transparent underwear, intimate")
-    print("  17) Ecchi Vintage       - Retro/pinup underwear, historical settings")
-    print("  18) Ecchi Themed        - Costume underwear (maid, nurse, etc)")
-    print("  19) Ecchi Nature        - Casual underwear, outdoor settings")
-    print("  20) Ecchi Torn          - Battle damaged, revealing tears")
-    print("  21) Ecchi Random        - Random from ALL ecchi presets above!")
-    print()
-    print("  ─── UNDERWEAR ONLY ───")
-    print("  22) Underwear Only      - All underwear types, intimate settings")
-    print()
-    print("  23) Random (All)        - Mix of everything (surprise me!)")
-    print()
-    
-    genre_map = {
-        "1": "cozy_slice_of_life",
-        "2": "urban_contemporary",
-        "3": "cyberpunk_noir",
-        "4": "scifi_future",
-        "5": "fantasy_adventure",
-        "6": "medieval_fantasy",
-        "7": "neo_noir",
-        "8": "nature_scenic",
-        "9": "action_torn",
-        "10": "ecchi_standard",
-        "11": "ecchi_scifi",
-        "12": "ecchi_fantasy",
-        "13": "ecchi_cute",
-        "14": "ecchi_athletic",
-        "15": "ecchi_elegant",
-        "16": "ecchi_sheer",
-        "17": "ecchi_vintage",
-        "18": "ecchi_themed",
-        "19": "ecchi_nature",
-        "20": "ecchi_torn",
-        "21": "ecchi_random",
-        "22": "underwear_only",
-        "23": "random"
-    }
+    # Banner + genre selection (menus are prebuilt, one write each)
+    sys.stdout.write(_GENRE_MENU)
     
     while True:
         choice = input("Enter choice (1-23): ").strip()
-        if choice in genre_map:
-            genre = genre_map[choice]
+        if choice in _GENRE_MAP:
+            genre = _GENRE_MAP[choice]
             break
         print("❌ Invalid choice. Please enter 1-23.")
     
@@ -1673,80 +1901,52 @@ def interactive_mode():
     
     # Number of prompts
     while True:
-        try:
-            count_input = input("📊 How many prompts to generate? (default: 1): ").strip()
-            count = int(count_input) if count_input else 1
-            if count > 0:
-                break
-            print("❌ Please enter a positive number.")
-        except ValueError:
+        count_input = input("📊 How many prompts to generate? (default: 1): ").strip()
+        if count_input and not _INT_RE.fullmatch(count_input):
             print("❌ Please enter a valid number.")
+            continue
+        count = int(count_input) if count_input else 1
+        if count > 0:
+            break
+        print("❌ Please enter a positive number.")
     
     print()
     
     # Quality preset
-    print("✨ QUALITY PRESET:")
-    print("   1) Ultra (default)   - Maximum quality tags")
-    print("   2) High              - Standard high quality")
-    print("   3) Standard          - Basic quality")
-    print("   4) Artistic          - Focus on artistic style")
-    print()
+    sys.stdout.write(_QUALITY_MENU)
     
-    quality_map = {
-        "1": "ultra", "2": "high", "3": "standard", "4": "artistic", "": "ultra"
-    }
     quality_input = input("   Select quality (1-4, default: 1): ").strip()
-    quality_preset = quality_map.get(quality_input, "ultra")
+    quality_preset = _QUALITY_MAP.get(quality_input, "ultra")
     
     print()
     
     # Camera distance option
-    print("📷 CAMERA DISTANCE / FRAMING:")
-    print("   1) Face Close-up    - Extreme close-up, face only")
-    print("   2) Portrait         - Head and shoulders, upper body")
-    print("   3) Half Body        - Cowboy shot, waist up")
-    print("   4) Full Body        - Whole body visible")
-    print("   5) Wide Scene       - Full body with environment")
-    print("   6) Random (default) - Mix of all distances")
-    print()
-    
-    distance_map = {
-        "1": "face_closeup",
-        "2": "portrait",
-        "3": "half_body",
-        "4": "full_body",
-        "5": "wide_scene",
-        "6": "random",
-        "": "random"
-    }
+    sys.stdout.write(_DISTANCE_MENU)
     
     distance_input = input("   Select distance (1-6, default: 6): ").strip()
-    distance_preset = distance_map.get(distance_input, "random")
+    distance_preset = _DISTANCE_MAP.get(distance_input, "random")
     
     print()
     
     # 1girl only option
-    print("👤 CHARACTER COUNT:")
-    print("   Force single character (1girl, solo) for all prompts?")
-    print("   Y = Always use '1girl, solo' (no 2girls)")
-    print("   N = Allow random character count (mostly 1girl, sometimes 2girls)")
-    print()
+    sys.stdout.write(_CHARACTER_MENU)
     force_1girl_input = input("   Force 1girl only? (Y/n, default: N): ").strip().lower()
     force_1girl = force_1girl_input == 'y'
     
     print()
     
     # Extra words option
-    print("📝 EXTRA WORDS (optional):")
-    print("   Add custom tags/words to append to EVERY prompt in batch.")
-    print("   Examples: 'rain, umbrella' or 'holding flowers' or 'looking at viewer'")
-    print()
+    sys.stdout.write(_EXTRA_WORDS_MENU)
     extra_words = input("   Enter extra words (leave blank to skip): ").strip()
     
     print()
     
     # Seed option
-    seed_input = input("🎲 Use a seed for reproducible results? (leave blank for random): ").strip()
+    while True:
+        seed_input = input("🎲 Use a seed for reproducible results? (leave blank for random): ").strip()
+        if not seed_input or _INT_RE.fullmatch(seed_input):
+            break
+        print("❌ Please enter a whole number, or leave blank.")
     seed = int(seed_input) if seed_input else None
     
     print()
@@ -1775,50 +1975,51 @@ def interactive_mode():
 def main():
     genre, count, seed, save_file, extra_words, distance_preset, force_1girl, quality_preset = interactive_mode()
     
-    # Generate prompts
-    prompts = []
-    for i in range(count):
-        current_seed = seed + i if seed is not None else None
-        
-        prompt = generate_prompt(
-            genre=genre,
-            seed=current_seed,
-            extra_words=extra_words,
-            distance_preset=distance_preset,
-            force_1girl=force_1girl,
-            quality_preset=quality_preset
-        )
-        
-        # Show progress for large batches
-        if count > 10 and i % 10 == 0 and i > 0:
-            print(f"Generated {i}/{count} prompts...")
-        
-        prompts.append(prompt)
+    # Show progress for large batches: every 10 prompts, thinned to ~100 lines for huge runs
+    report_every = max(10, count // 100)
+    next_report = report_every
+
+    def _progress(done: int) -> None:
+        nonlocal next_report
+        if done - 1 == next_report:
+            print(f"Generated {next_report}/{count} prompts...")
+            next_report += report_every
+
+    # Generate prompts (seeded batches use seed + i per prompt, like the GUIs,
+    # so any single prompt can be reproduced on its own)
+    options = dict(
+        genre=genre,
+        extra_words=extra_words,
+        distance_preset=distance_preset,
+        force_1girl=force_1girl,
+        quality_preset=quality_preset,
+    )
+    if count >= _PARALLEL_MIN_COUNT and (os.cpu_count() or 1) > 1:
+        prompts = _generate_prompts_parallel(count, seed, options, progress=_progress)
+    else:
+        prompts = generate_prompts(count, seed=seed, progress=_progress, **options)
     
     print()
     
-    # Display prompts to console
+    # Display prompts to console (one write, not three prints per prompt)
     if not save_file:
-        print("=" * 64)
-        print("GENERATED PROMPTS:")
-        print("=" * 64)
-        print()
-        for i, prompt in enumerate(prompts, 1):
-            print(f"PROMPT #{i}:")
-            print(prompt)
-            print()
+        rule = "=" * 64
+        sys.stdout.write(
+            f"{rule}\nGENERATED PROMPTS:\n{rule}\n\n"
+            + "".join(f"PROMPT #{i}:\n{prompt}\n\n" for i, prompt in enumerate(prompts, 1))
+        )
     
     # Save to file if requested
     if save_file:
         if not save_file.endswith('.txt'):
-            save_file = save_file + '.txt'
+            save_file = f"{save_file}.txt"
         
+        # One write for the whole batch instead of one per prompt
         with open(save_file, 'w', encoding='utf-8') as f:
-            for prompt in prompts:
-                f.write(prompt + '\n')
+            f.write("".join(f"{prompt}\n" for prompt in prompts))
         
         print(f"✓ Saved {len(prompts)} prompt(s) to {save_file}")
-        print(f"  Format: One prompt per line (ready for batch automation!)")
+        print("  Format: One prompt per line (ready for batch automation!)")
         print(f"  Quality preset: {quality_preset}")
         if extra_words:
             print(f"  Extra words appended: '{extra_words}'")
@@ -1843,4 +2044,7 @@ def main():
         input("Press Enter to exit...")
 
 if __name__ == "__main__":
+    # Needed for the process pool in frozen Windows builds
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
@@ -1,12 +1,22 @@
 # rthook_pillow_tk.py
 # Force Pillow's Tk helpers to be importable inside the frozen app
 # and register the ImageTk bridge early.
-try:
-    import PIL._tkinter_finder  # noqa: F401
-except Exception:
-    pass
+# Only ttkbootstrap (optional theming) uses Pillow, so skip the import work
+# when it was not bundled.
+import importlib.util
 
 try:
-    from PIL import ImageTk  # noqa: F401
+    _HAS_TTKBOOTSTRAP = importlib.util.find_spec("ttkbootstrap") is not None
 except Exception:
-    pass
+    _HAS_TTKBOOTSTRAP = False
+
+if _HAS_TTKBOOTSTRAP:
+    try:
+        import PIL._tkinter_finder  # noqa: F401
+    except Exception:
+        pass
+
+    try:
+        from PIL import ImageTk  # noqa: F401
+    except Exception:
+        pass